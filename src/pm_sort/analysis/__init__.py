@@ -0,0 +1,11 @@
+from .agreement import AGREEMENT_METHODS, agreement_tensor
+from .position_bias import position_bias, summarize_position_bias
+from .rank import (
+    borda_aggregate,
+    kendall_tau_b,
+    kendall_tau_distance_matrix,
+    kendall_tau_matrix,
+    median_rank_aggregate,
+    rank_dispersion,
+    rank_positions,
+)
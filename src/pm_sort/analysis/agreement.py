@@ -0,0 +1,156 @@
+import numpy as np
+from scipy.stats import rankdata
+
+from ..core.cache import list_models, load_results, nested_int_keys, results_digest
+from ..core.criteria import CRITERIA
+from ..core.data import load_prime_ministers
+from ..methods.pairwise.matrix import build_winner_matrix
+from ..methods.pairwise.pivot import prior_from_listwise, prior_from_pointwise
+from ..methods.pairwise.tournament import tournament_scores_from_matrix
+
+# 比較対象の手法。いずれも「値が大きいほど右寄り」のスコアに揃えて比較する。
+AGREEMENT_METHODS = ("pointwise", "listwise", "win_count", "kwiksort")
+
+# キャッシュ内容のダイジェスト → 計算結果
+_MEMO: dict[str, dict] = {}
+
+
+def _cache_keys(criterion_name: str) -> list[tuple[str, str]]:
+    return [
+        ("pointwise", criterion_name),
+        ("listwise", criterion_name),
+        ("pairwise", criterion_name),
+        (f"pairwise/kwiksort/{criterion_name}", "seed_0"),
+    ]
+
+
+def _method_scores(model: str, criterion_name: str, nos: np.ndarray) -> np.ndarray:
+    """各手法の結果を (手法数, n) のスコア配列にする。結果がない人物・手法は NaN。"""
+    scores = np.full((len(AGREEMENT_METHODS), len(nos)), np.nan)
+
+    def fill(row: int, values: dict[int, float]) -> None:
+        scores[row] = [values.get(int(no), np.nan) for no in nos]
+
+    pointwise = load_results("pointwise", criterion_name, model=model)
+    if pointwise:
+        fill(0, prior_from_pointwise(pointwise))
+
+    listwise = load_results("listwise", criterion_name, model=model)
+    if listwise:
+        fill(1, prior_from_listwise(listwise))
+
+    pairwise = load_results("pairwise", criterion_name, model=model)
+    if pairwise:
+        pair_nos, W = build_winner_matrix(nested_int_keys(pairwise))
+        wins = tournament_scores_from_matrix(pair_nos, W)["win_count"]
+        fill(2, dict(zip(pair_nos.tolist(), wins.tolist())))
+
+    kwiksort = load_results(
+        f"pairwise/kwiksort/{criterion_name}", "seed_0", model=model
+    )
+    if kwiksort:
+        fill(3, {no: float(i) for i, no in enumerate(kwiksort["ranking"])})
+
+    return scores
+
+
+def _pair_signs(x: np.ndarray) -> np.ndarray:
+    """全ペア (i < j) の sign(x_i − x_j)。どちらかが NaN のペアは 0。"""
+    I, J = np.triu_indices(x.shape[-1], 1)
+    return np.nan_to_num(np.sign(x[..., I] - x[..., J]))
+
+
+def _agreement(scores: np.ndarray, top_k: int) -> dict[str, np.ndarray]:
+    """(M, C, K, n) のスコアから手法ペアごとの一致度 (M, M, C, K) をまとめて計算する。
+
+    各手法ペアは、両方に結果がある人物だけを対象に比較する。
+    """
+    valid = ~np.isnan(scores)
+
+    # Kendall τ-b: 符号ベクトルの内積。分母は相手側でも比較可能なペアに限定する。
+    S = _pair_signs(scores)
+    I, J = np.triu_indices(scores.shape[-1], 1)
+    pair_valid = (valid[..., I] & valid[..., J]).astype(np.float64)
+    numerator = np.einsum("mckp,nckp->mnck", S, S)
+    norm_x = np.einsum("mckp,nckp->mnck", S**2, pair_valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = numerator / np.sqrt(norm_x * np.swapaxes(norm_x, 0, 1))
+
+    # Spearman ρ: 共通の人物だけで平均順位を付け直し、ピアソン相関を取る
+    common = valid[:, None] & valid[None, :]
+    x = np.where(common, scores[:, None], np.nan)
+    y = np.where(common, scores[None, :], np.nan)
+    n_common = common.sum(axis=-1)
+    rx = rankdata(x, axis=-1, nan_policy="omit")
+    ry = rankdata(y, axis=-1, nan_policy="omit")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 共通人数 m の平均順位は (m + 1) / 2
+        mean_rank = ((n_common + 1) / 2)[..., None]
+        dx, dy = rx - mean_rank, ry - mean_rank
+        rho = np.nansum(dx * dy, axis=-1) / np.sqrt(
+            np.nansum(dx**2, axis=-1) * np.nansum(dy**2, axis=-1)
+        )
+
+    # 上位 k 人（右寄り側）の重なり。同点は番号順で切る。
+    def top_mask(v: np.ndarray) -> np.ndarray:
+        order = np.argsort(np.where(np.isnan(v), np.inf, -v), axis=-1, kind="stable")
+        positions = np.empty_like(order)
+        np.put_along_axis(
+            positions, order, np.broadcast_to(np.arange(v.shape[-1]), v.shape), axis=-1
+        )
+        return positions < top_k
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overlap = (top_mask(x) & top_mask(y)).sum(axis=-1) / np.minimum(top_k, n_common)
+    empty = n_common < 2
+    for arr in (tau, rho, overlap):
+        arr[empty] = np.nan
+    return {"kendall_tau": tau, "spearman_rho": rho, "top_k_overlap": overlap}
+
+
+def agreement_tensor(
+    *,
+    models: list[str] | None = None,
+    criteria: list[str] | None = None,
+    top_k: int = 10,
+) -> dict:
+    """全モデル・全評価軸について、手法間の一致度テンソルをまとめて計算する。
+
+    ポイントワイズ（スコア）、リストワイズ（出力順）、勝利数ソート（全ペア比較）、
+    KwikSort（seed 0）の結果をキャッシュから読み込み、「右寄りほど大きい」スコアに揃えて
+    Kendall τ-b・Spearman ρ・上位 k 人の重なり率を計算する。
+    キャッシュ内容のダイジェストが同じなら前回の計算結果を返す。
+
+    Returns:
+        {"methods", "criteria", "models", "top_k",
+         "kendall_tau", "spearman_rho", "top_k_overlap"}
+        各指標は (手法, 手法, 評価軸, モデル) の配列で、結果がない組は NaN。
+    """
+    models = models if models is not None else list_models()
+    criteria = criteria if criteria is not None else list(CRITERIA)
+
+    digest = "|".join(
+        f"{model}:{results_digest([k for c in criteria for k in _cache_keys(c)], model=model)}"
+        for model in models
+    )
+    memo_key = f"{top_k}|{','.join(criteria)}|{digest}"
+    if memo_key in _MEMO:
+        return _MEMO[memo_key]
+
+    nos = np.array([p["no"] for p in load_prime_ministers()])
+    scores = np.full(
+        (len(AGREEMENT_METHODS), len(criteria), len(models), len(nos)), np.nan
+    )
+    for k, model in enumerate(models):
+        for c, criterion_name in enumerate(criteria):
+            scores[:, c, k] = _method_scores(model, criterion_name, nos)
+
+    result = {
+        "methods": list(AGREEMENT_METHODS),
+        "criteria": criteria,
+        "models": models,
+        "top_k": top_k,
+        **_agreement(scores, top_k),
+    }
+    _MEMO[memo_key] = result
+    return result
@@ -0,0 +1,124 @@
+import numpy as np
+
+from ..core.cache import list_models, load_results, nested_int_keys, save_results
+from ..core.criteria import CRITERIA
+from ..methods.pairwise.matrix import WIN_A, WIN_B, build_winner_matrix
+
+# 保存するサマリーのファイル名サフィックス（pairwise/<criterion>_position_bias.json）
+SUMMARY_SUFFIX = "_position_bias"
+
+
+def position_bias(
+    pair_results: dict,
+    *,
+    n_bootstrap: int = 1000,
+    ci: float = 0.95,
+    seed: int | None = None,
+) -> dict:
+    """全ペア比較データのポジションバイアスを一括で集計する。
+
+    INVALID・欠落・逆方向からの推定エントリは除外し、A / B で回答された比較のみを使う。
+
+    - first_win_rate: 先出し（A）が勝者に選ばれた割合
+    - ci_low / ci_high / p_value: ペア単位のブートストラップによる first_win_rate の
+      信頼区間と、「先出し勝率 = 0.5」に対する両側 p 値
+    - inconsistent_rate: 両方向とも回答があるペアのうち、同じ位置（AA / BB）が勝った割合
+    - per_item: 人物ごとの先出し時・後出し時の勝率と、その差（bias）
+
+    Returns:
+        JSON にそのまま保存できるサマリー dict。
+    """
+    nos, W = build_winner_matrix(pair_results, include_inferred=False)
+    valid = (W == WIN_A) | (W == WIN_B)
+    first_win = W == WIN_A
+
+    n_valid = int(valid.sum())
+    first_rate = first_win.sum() / n_valid if n_valid else float("nan")
+
+    # ペア (i < j) ごとの有効回答数と先出し勝ち数
+    I, J = np.triu_indices(len(nos), 1)
+    pair_valid = valid[I, J].astype(np.int64) + valid[J, I]
+    pair_first = first_win[I, J].astype(np.int64) + first_win[J, I]
+    observed = pair_valid > 0
+    pair_valid, pair_first = pair_valid[observed], pair_first[observed]
+
+    ci_low = ci_high = p_value = None
+    if n_bootstrap > 0 and len(pair_valid) > 0:
+        rng = np.random.default_rng(seed)
+        idx = rng.integers(0, len(pair_valid), size=(n_bootstrap, len(pair_valid)))
+        rates = pair_first[idx].sum(axis=1) / pair_valid[idx].sum(axis=1)
+        alpha = (1 - ci) / 2
+        ci_low, ci_high = (float(x) for x in np.quantile(rates, [alpha, 1 - alpha]))
+        # 0.5 を挟んだ反対側に出たブートストラップ推定の割合から両側 p 値を求める
+        tail = np.mean(rates <= 0.5) if first_rate > 0.5 else np.mean(rates >= 0.5)
+        p_value = float(min(1.0, 2 * tail))
+
+    both = valid & valid.T
+    same_slot = both & (W == W.T)
+    n_both = int(np.triu(both, 1).sum())
+    inconsistent_rate = np.triu(same_slot, 1).sum() / n_both if n_both else None
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        item_first = first_win.sum(axis=1) / valid.sum(axis=1)
+        item_second = (W == WIN_B).sum(axis=0) / valid.sum(axis=0)
+    per_item = {
+        int(no): {
+            "first_win_rate": _round(item_first[i]),
+            "second_win_rate": _round(item_second[i]),
+            "bias": _round(item_first[i] - item_second[i]),
+        }
+        for i, no in enumerate(nos)
+    }
+
+    return {
+        "n_comparisons": n_valid,
+        "first_win_rate": _round(first_rate),
+        "ci_low": _round(ci_low),
+        "ci_high": _round(ci_high),
+        "p_value": _round(p_value),
+        "inconsistent_rate": _round(inconsistent_rate),
+        "per_item": per_item,
+    }
+
+
+def _round(x: float | None) -> float | None:
+    if x is None or np.isnan(x):
+        return None
+    return round(float(x), 4)
+
+
+def summarize_position_bias(
+    *,
+    models: list[str] | None = None,
+    criteria: list[str] | None = None,
+    n_bootstrap: int = 1000,
+    seed: int | None = None,
+    save: bool = True,
+) -> list[dict]:
+    """キャッシュ済みの全ペア比較データについて、モデル×評価軸ごとにバイアスを集計する。
+
+    save=True のとき、各サマリーを pairwise/<criterion>_position_bias.json として
+    モデルごとのディレクトリに保存する（ダッシュボード等はこちらを読めばよい）。
+
+    Returns:
+        [{"model", "criterion", ...position_bias の結果}, ...]
+    """
+    summaries = []
+    for model in models if models is not None else list_models():
+        for criterion_name in criteria if criteria is not None else list(CRITERIA):
+            cached = load_results("pairwise", criterion_name, model=model)
+            if not cached:
+                continue
+            summary = {
+                "model": model,
+                "criterion": criterion_name,
+                **position_bias(
+                    nested_int_keys(cached), n_bootstrap=n_bootstrap, seed=seed
+                ),
+            }
+            if save:
+                save_results(
+                    "pairwise", criterion_name, summary, SUMMARY_SUFFIX, model=model
+                )
+            summaries.append(summary)
+    return summaries
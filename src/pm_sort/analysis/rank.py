@@ -0,0 +1,102 @@
+import numpy as np
+
+# kendall_tau_distance_matrix で一度に処理する行数（メモリ使用量の上限調整用）
+_BLOCK_ROWS = 1024
+
+
+def rank_positions(rankings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(k, n) のランキング配列を、人物ごとの位置（0始まり）の配列に変換する。
+
+    rankings の各行は同じ n 人の首相番号の並べ替え（例: kwiksort_batch の返り値）。
+
+    Returns:
+        (nos, positions) — nos は昇順の首相番号、positions[r, i] は
+        ランキング r における nos[i] の位置。
+    """
+    rankings = np.atleast_2d(np.asarray(rankings))
+    k, n = rankings.shape
+    nos = np.sort(rankings[0])
+    idx = np.searchsorted(nos, rankings)
+    positions = np.empty((k, n), dtype=np.int64)
+    np.put_along_axis(positions, idx, np.broadcast_to(np.arange(n), (k, n)), axis=1)
+    return nos, positions
+
+
+def _pair_signs(values: np.ndarray) -> np.ndarray:
+    """全ペア (i < j) について sign(values[i] − values[j]) を並べた int8 配列。"""
+    n = values.shape[-1]
+    I, J = np.triu_indices(n, 1)
+    return np.sign(values[..., I] - values[..., J]).astype(np.int8)
+
+
+def kendall_tau_distance_matrix(rankings: np.ndarray) -> np.ndarray:
+    """k 個のランキング間の Kendall τ 距離（順序が食い違うペア数）の k × k 行列。
+
+    各ランキングを全ペアの符号ベクトル S（長さ n(n−1)/2、要素 ±1）に変換すると
+    S_a · S_b = 一致ペア数 − 不一致ペア数 となるため、距離は行列積1回で求まる。
+    k が大きい場合は行ブロックごとに計算する。
+    """
+    _, positions = rank_positions(rankings)
+    S = _pair_signs(positions).astype(np.float32)
+    m = S.shape[1]
+    k = len(S)
+    D = np.empty((k, k), dtype=np.int64)
+    for start in range(0, k, _BLOCK_ROWS):
+        block = S[start : start + _BLOCK_ROWS] @ S.T
+        D[start : start + _BLOCK_ROWS] = np.rint((m - block) / 2)
+    return D
+
+
+def kendall_tau_matrix(rankings: np.ndarray) -> np.ndarray:
+    """k 個のランキング間の Kendall τ の k × k 行列。"""
+    n = np.atleast_2d(rankings).shape[1]
+    m = n * (n - 1) / 2
+    return 1 - 2 * kendall_tau_distance_matrix(rankings) / m
+
+
+def kendall_tau_b(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x の各行と y の Kendall τ-b（同順位を考慮）を計算する。
+
+    scipy.stats.kendalltau のデフォルト（τ-b）と同じ値を、行ごとのループなしで返す。
+    x は (k, n) または (n,)、y は (n,) の同じ人物順の順位・スコア配列。
+    """
+    Sx = _pair_signs(np.atleast_2d(x)).astype(np.float64)
+    Sy = _pair_signs(np.asarray(y)).astype(np.float64)
+    numerator = Sx @ Sy
+    denominator = np.sqrt((Sx**2).sum(axis=1) * (Sy**2).sum())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return numerator / denominator
+
+
+def borda_aggregate(rankings: np.ndarray) -> np.ndarray:
+    """平均位置（Borda 得点）で合意ランキングを作る。同点は番号順。"""
+    nos, positions = rank_positions(rankings)
+    return nos[np.lexsort((nos, positions.mean(axis=0)))]
+
+
+def median_rank_aggregate(rankings: np.ndarray) -> np.ndarray:
+    """位置の中央値で合意ランキングを作る。同点は平均位置、番号の順で決める。"""
+    nos, positions = rank_positions(rankings)
+    order = np.lexsort((nos, positions.mean(axis=0), np.median(positions, axis=0)))
+    return nos[order]
+
+
+def rank_dispersion(rankings: np.ndarray) -> dict[str, np.ndarray]:
+    """人物ごとの順位（1始まり）の平均・標準偏差・最小・最大をまとめて計算する。
+
+    標準偏差は不偏標準偏差（ddof=1、polars の std と同じ）。
+
+    Returns:
+        {"no", "mean_rank", "std_rank", "min_rank", "max_rank"} — 各値は nos 順の配列。
+    """
+    nos, positions = rank_positions(rankings)
+    ranks = positions + 1
+    return {
+        "no": nos,
+        "mean_rank": ranks.mean(axis=0),
+        "std_rank": ranks.std(axis=0, ddof=1)
+        if len(ranks) > 1
+        else np.full(len(nos), np.nan),
+        "min_rank": ranks.min(axis=0),
+        "max_rank": ranks.max(axis=0),
+    }
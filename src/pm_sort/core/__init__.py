@@ -1,5 +1,19 @@
-from .api import Usage, calculate_cost, format_usage_summary
-from .cache import has_cache, load_results, nested_int_keys, save_results
+from .api import Usage, calculate_cost, format_usage_summary, summarize_parse_modes
+from .cache import (
+    has_cache,
+    list_models,
+    list_results,
+    load_results,
+    nested_int_keys,
+    results_digest,
+    save_results,
+)
 from .config import MAX_CONCURRENCY, get_model
-from .criteria import CRITERIA, DEFAULT_CRITERION, Criterion
+from .criteria import (
+    CRITERIA,
+    DEFAULT_CRITERION,
+    MIRROR_CRITERIA,
+    Criterion,
+    get_criterion,
+)
 from .data import load_prime_ministers
@@ -1,5 +1,7 @@
 import asyncio
+import json
 import time
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
@@ -62,6 +64,16 @@ class Usage:
         )
 
 
+def split_usage(usage: Usage, k: int) -> list[Usage]:
+    """1回の呼び出しの使用量を k 件に分配する（合計は元の使用量と一致する）。"""
+    parts: list[dict] = [{} for _ in range(k)]
+    for key, value in usage.to_dict().items():
+        base, remainder = divmod(value, k)
+        for i in range(k):
+            parts[i][key] = base + (1 if i < remainder else 0)
+    return [Usage.from_dict(part) for part in parts]
+
+
 def extract_usage(response) -> Usage:
     """APIレスポンスからトークン使用量を抽出する。"""
     u = getattr(response, "usage", None)
@@ -99,6 +111,69 @@ def extract_reasoning_summary(response) -> str:
     return ""
 
 
+# ---------------------------------------------------------------------------
+# 構造化出力（JSON スキーマ）
+# ---------------------------------------------------------------------------
+
+# 結果の parse_mode の値
+PARSE_MODE_TEXT = "text"  # テキスト出力を正規表現でパース
+PARSE_MODE_JSON = "json"  # JSON スキーマ出力をデコード
+PARSE_MODE_JSON_FALLBACK = (
+    "json_fallback"  # JSON のデコードに失敗しテキストとしてパース
+)
+
+
+def json_schema_format(name: str, properties: dict) -> dict:
+    """Responses API の text パラメータに渡す JSON スキーマ形式の指定を作る。
+
+    properties の全項目を必須とし、追加のプロパティを許さない strict モードで指定する。
+    """
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        }
+    }
+
+
+def parse_json_output(text: str) -> dict | None:
+    """構造化出力のテキストを dict にデコードする。失敗時は None。"""
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def summarize_parse_modes(
+    results: list[dict], *, is_failure: Callable[[dict], bool]
+) -> dict[str, dict]:
+    """結果dictのリストを parse_mode ごとに集計し、パース失敗率を返す。
+
+    parse_mode のない結果（構造化出力の導入前のキャッシュ）はテキスト出力として数える。
+
+    Returns:
+        {parse_mode: {"count", "failures", "failure_rate"}}
+    """
+    summary: dict[str, dict] = {}
+    for r in results:
+        row = summary.setdefault(
+            r.get("parse_mode", PARSE_MODE_TEXT), {"count": 0, "failures": 0}
+        )
+        row["count"] += 1
+        row["failures"] += int(is_failure(r))
+    for row in summary.values():
+        row["failure_rate"] = row["failures"] / row["count"]
+    return summary
+
+
 # ---------------------------------------------------------------------------
 # API呼び出し
 # ---------------------------------------------------------------------------
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from pathlib import Path
@@ -10,31 +11,52 @@ logger = logging.getLogger(__name__)
 RESULTS_DIR = Path(__file__).parent.parent.parent.parent / "data" / "results"
 
 
-def _cache_path(experiment: str, criterion_name: str, suffix: str = "") -> Path:
-    """キャッシュファイルのパスを生成する。ディレクトリが無ければ作成する。"""
-    d = RESULTS_DIR / get_model() / experiment
+def _cache_path(
+    experiment: str, criterion_name: str, suffix: str = "", model: str | None = None
+) -> Path:
+    """キャッシュファイルのパスを生成する。ディレクトリが無ければ作成する。
+
+    model を省略すると環境変数 LLM_SORT_MODEL のモデルのディレクトリを使う。
+    """
+    d = RESULTS_DIR / (model or get_model()) / experiment
     d.mkdir(parents=True, exist_ok=True)
     return d / f"{criterion_name}{suffix}.json"
 
 
-def has_cache(experiment: str, criterion_name: str, suffix: str = "") -> bool:
+def list_models() -> list[str]:
+    """キャッシュが存在するモデル名を列挙する。"""
+    if not RESULTS_DIR.is_dir():
+        return []
+    return sorted(p.name for p in RESULTS_DIR.iterdir() if p.is_dir())
+
+
+def has_cache(
+    experiment: str, criterion_name: str, suffix: str = "", *, model: str | None = None
+) -> bool:
     """指定された実験・基準のキャッシュが存在するか確認する。"""
-    return _cache_path(experiment, criterion_name, suffix).exists()
+    return _cache_path(experiment, criterion_name, suffix, model).exists()
 
 
 def save_results(
-    experiment: str, criterion_name: str, data: Any, suffix: str = ""
+    experiment: str,
+    criterion_name: str,
+    data: Any,
+    suffix: str = "",
+    *,
+    model: str | None = None,
 ) -> Path:
     """結果をJSONファイルとして保存し、パスを返す。"""
-    path = _cache_path(experiment, criterion_name, suffix)
+    path = _cache_path(experiment, criterion_name, suffix, model)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
     return path
 
 
-def load_results(experiment: str, criterion_name: str, suffix: str = "") -> Any | None:
+def load_results(
+    experiment: str, criterion_name: str, suffix: str = "", *, model: str | None = None
+) -> Any | None:
     """キャッシュされた結果を読み込む。存在しないか破損していれば None を返す。"""
-    path = _cache_path(experiment, criterion_name, suffix)
+    path = _cache_path(experiment, criterion_name, suffix, model)
     if not path.exists():
         return None
     try:
@@ -47,6 +69,28 @@ def load_results(experiment: str, criterion_name: str, suffix: str = "") -> Any
         return None
 
 
+def list_results(experiment: str, *, model: str | None = None) -> list[str]:
+    """指定された実験でキャッシュ済みの基準名（ファイル名の stem）を列挙する。"""
+    d = RESULTS_DIR / (model or get_model()) / experiment
+    if not d.is_dir():
+        return []
+    return sorted(p.stem for p in d.glob("*.json"))
+
+
+def results_digest(keys: list[tuple[str, str]], *, model: str | None = None) -> str:
+    """(experiment, criterion_name) のキャッシュファイル群の内容から SHA-256 ダイジェストを作る。
+
+    存在しないファイルも「無い」ことを含めてダイジェストに反映する。
+    集計結果のメモ化キーとして使う。
+    """
+    h = hashlib.sha256()
+    for experiment, criterion_name in keys:
+        path = _cache_path(experiment, criterion_name, model=model)
+        h.update(f"{experiment}/{criterion_name}\0".encode())
+        h.update(path.read_bytes() if path.exists() else b"\0missing\0")
+    return h.hexdigest()
+
+
 def nested_int_keys(d: dict) -> dict:
     """2階層ネスト辞書のJSON文字列キーをintに変換する。
 
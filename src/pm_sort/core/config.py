@@ -32,6 +32,9 @@ MODEL_PRICING: dict[str, dict[str, float]] = {
     },
 }
 
+# モデルカスケードの既定の段階（安いモデルから順に）。
+MODEL_CASCADE = ("gpt-5-nano", "gpt-5-mini")
+
 
 def get_model() -> str:
     """環境変数 LLM_SORT_MODEL からモデル名を取得する。"""
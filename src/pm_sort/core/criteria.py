@@ -8,6 +8,8 @@ class Criterion:
     left: str
     right: str
     description: str
+    # 左右の極を入れ替えた基準の場合、元の基準の name。結果は元の基準から導出できる。
+    mirror_of: str | None = None
 
 
 CRITERIA: dict[str, Criterion] = {
@@ -55,4 +57,25 @@ CRITERIA: dict[str, Criterion] = {
     ),
 }
 
+# 既存の基準の左右を入れ替えた基準。API を呼ばずに元の基準の結果から導出する。
+MIRROR_CRITERIA: dict[str, Criterion] = {
+    "right_left": Criterion(
+        name="right_left",
+        label_ja="右派 ↔ 左派",
+        left="右派",
+        right="左派",
+        description="伝統・秩序・現状維持を重視する右派的な政治姿勢か、改革・変革を志向する左派的な政治姿勢か",
+        mirror_of="left_right",
+    ),
+}
+
 DEFAULT_CRITERION = "left_right"
+
+
+def get_criterion(name: str) -> Criterion:
+    """CRITERIA・MIRROR_CRITERIA から名前で基準を取得する。"""
+    if name in CRITERIA:
+        return CRITERIA[name]
+    if name in MIRROR_CRITERIA:
+        return MIRROR_CRITERIA[name]
+    raise KeyError(f"未定義の基準です: {name!r}")
@@ -1,11 +1,52 @@
-from .listwise import rank_listwise
+from .hybrid import evaluate_hybrid_sort, hybrid_sort_cached, hybrid_sort_live
+from .listwise import (
+    rank_listwise,
+    rank_listwise_windowed,
+    repair_listwise,
+    validate_listwise,
+)
+from .mirror import (
+    load_mirrored_results,
+    mirror_kwiksort_run,
+    mirror_listwise_result,
+    mirror_pair_results,
+    mirror_pointwise_results,
+    mirrored_pair_entry,
+    mirrored_pointwise_entry,
+    reject_mirror_query,
+)
+from .model_cascade import (
+    compare_pairs_model_cascade,
+    load_cascade_results,
+    score_pointwise_model_cascade,
+)
 from .pairwise import (
+    ComparisonStore,
     PairwiseResult,
     compare_pair,
+    compare_pairs_adaptive,
+    compare_pairs_banded,
+    compare_pairs_effort_cascade,
+    compare_pairs_multi,
     find_transitivity_violations,
+    kwiksort_batch,
     kwiksort_cached,
     kwiksort_live,
     resolve_winner,
+    tournament_scores,
     win_count_sort,
 )
-from .pointwise import PointwiseResult, score_pointwise
+from .pointwise import (
+    PointwiseResult,
+    SampledPointwiseResult,
+    pointwise_needs_escalation,
+    pointwise_parse_stats,
+    score_pointwise,
+    score_pointwise_batch,
+    score_pointwise_sampled,
+)
+from .requery import (
+    requery_cached,
+    requery_invalid_pairwise,
+    requery_invalid_pointwise,
+)
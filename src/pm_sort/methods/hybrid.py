@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable, Generator
+
+from openai import AsyncOpenAI
+from scipy.stats import kendalltau
+
+from ..core.api import maybe_acquire
+from ..core.criteria import Criterion
+from .listwise import rank_listwise, repair_listwise
+from .pairwise.analyze import win_count_sort
+from .pairwise.compare import PairwiseResult, compare_pair
+from .pairwise.store import ComparisonStore
+
+
+def _chunks(items: list, chunk_size: int) -> list[list]:
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _merge_steps(left: list[dict], right: list[dict]) -> Generator:
+    """左寄り→右寄りに並んだ2つの列を先頭同士の比較でマージするジェネレータ。
+
+    比較する (a, b) を yield し、send された勝者（a を A、b を B として提示した比較の
+    勝者。"A" なら a がより右寄り）で次に進む。マージ結果は StopIteration.value で返す。
+    INVALID・欠落は同等として左の列を先に取る（安定マージ）。
+    """
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        winner = yield left[i], right[j]
+        if winner == "A":
+            merged.append(right[j])
+            j += 1
+        else:
+            merged.append(left[i])
+            i += 1
+    return merged + left[i:] + right[j:]
+
+
+def _merge(left: list[dict], right: list[dict], winner: Callable) -> list[dict]:
+    """_merge_steps を同期の winner(a, b) で最後まで進める。"""
+    steps = _merge_steps(left, right)
+    try:
+        pair = next(steps)
+        while True:
+            pair = steps.send(winner(*pair))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _merge_level(
+    runs: list[list[dict]], compare_many: Callable[[list], Awaitable[list[str]]]
+) -> list[list[dict]]:
+    """隣り合う列を2つずつマージする1段分を、全マージ同時に進める。
+
+    各マージの次の比較をまとめて compare_many((a, b) のリスト → 勝者のリスト) に渡すため、
+    段あたりの逐次の呼び出しは最も長いマージの比較回数で済む。
+    """
+    merged: list[list[dict] | None] = []
+    steps: dict[int, Generator] = {}
+    pending: dict[int, tuple[dict, dict]] = {}
+    for k, pair in enumerate(_chunks(runs, 2)):
+        merged.append(pair[0] if len(pair) == 1 else None)
+        if len(pair) == 2:
+            steps[k] = _merge_steps(pair[0], pair[1])
+            try:
+                pending[k] = next(steps[k])
+            except StopIteration as stop:
+                merged[k] = stop.value
+
+    while pending:
+        keys = list(pending)
+        winners = await compare_many([pending[k] for k in keys])
+        for k, winner in zip(keys, winners):
+            try:
+                pending[k] = steps[k].send(winner)
+            except StopIteration as stop:
+                merged[k] = stop.value
+                del pending[k]
+    return merged
+
+
+def hybrid_sort_cached(
+    items: list[dict],
+    pair_results: dict,
+    listwise_order: list[int],
+    *,
+    chunk_size: int = 16,
+    rng: random.Random | None = None,
+    comparison_log: list | None = None,
+) -> list[dict]:
+    """チャンク内はリストワイズの順位、チャンク間は全ペア比較の結果でマージする（API呼び出しなし）。
+
+    items をランダムに chunk_size 人ずつのチャンクに分け、各チャンクを
+    listwise_order（左寄り→右寄りの番号リスト）での相対順に並べた後、
+    隣り合うチャンクを2つずつマージしていく。
+    チャンクごとのリストワイズ評価のキャッシュはないため、全員を1回で並べた
+    リストワイズ結果をチャンクに制限した順位で代用する。
+    """
+    if rng is None:
+        rng = random.Random()
+    position = {no: i for i, no in enumerate(listwise_order)}
+
+    def winner(a: dict, b: dict) -> str:
+        if comparison_log is not None:
+            comparison_log.append({"no_a": a["no"], "no_b": b["no"]})
+        entry = pair_results.get(a["no"], {}).get(b["no"])
+        return entry["winner"] if entry is not None else "INVALID"
+
+    shuffled = list(items)
+    rng.shuffle(shuffled)
+    runs = [
+        sorted(chunk, key=lambda item: position.get(item["no"], len(position)))
+        for chunk in _chunks(shuffled, chunk_size)
+    ]
+    while len(runs) > 1:
+        runs = [
+            _merge(pair[0], pair[1], winner) if len(pair) == 2 else pair[0]
+            for pair in _chunks(runs, 2)
+        ]
+    return runs[0] if runs else []
+
+
+def evaluate_hybrid_sort(
+    items: list[dict],
+    pair_results: dict,
+    listwise_order: list[int],
+    *,
+    chunk_sizes: tuple[int, ...] = (4, 8, 16, 32, 64),
+    n_seeds: int = 20,
+) -> list[dict]:
+    """チャンクサイズごとに hybrid_sort_cached を実行し、呼び出し回数と精度を集計する。
+
+    精度は全ペア比較の勝利数ソート（win_count_sort）との Kendall τ。
+    全ペア比較は n(n − 1) 回、chunk_size = n は1回のリストワイズ評価のみに相当する。
+
+    Returns:
+        [{"chunk_size", "listwise_calls", "mean_comparisons", "mean_kendall_tau"}, ...]
+    """
+    reference = {no: rank for no, rank, _ in win_count_sort(pair_results)}
+    rows = []
+    for chunk_size in chunk_sizes:
+        comparisons, taus = [], []
+        for seed in range(n_seeds):
+            log: list = []
+            ranking = hybrid_sort_cached(
+                items,
+                pair_results,
+                listwise_order,
+                chunk_size=chunk_size,
+                rng=random.Random(seed),
+                comparison_log=log,
+            )
+            comparisons.append(len(log))
+            # win_count_sort は右寄りが1位のため、位置（左→右）とは逆向きになる
+            tau = kendalltau(
+                range(len(ranking)), [reference[item["no"]] for item in ranking]
+            ).statistic
+            taus.append(-float(tau))
+        rows.append(
+            {
+                "chunk_size": chunk_size,
+                "listwise_calls": len(_chunks(items, chunk_size)),
+                "mean_comparisons": sum(comparisons) / n_seeds,
+                "mean_kendall_tau": sum(taus) / n_seeds,
+            }
+        )
+    return rows
+
+
+async def hybrid_sort_live(
+    items: list[dict],
+    criterion: Criterion,
+    client: AsyncOpenAI,
+    *,
+    chunk_size: int = 16,
+    semaphore: asyncio.Semaphore | None = None,
+    rng: random.Random | None = None,
+    store: ComparisonStore | None = None,
+) -> tuple[list[dict], dict]:
+    """リストワイズで並べたチャンクを、ペアワイズ比較でマージしながら全体をソートする。
+
+    items をランダムに chunk_size 人ずつに分けて rank_listwise で並列に並べ
+    （欠落・重複は repair_listwise で修復し、修復の使用量は "repair_usage" に分けて記録）、
+    隣り合うチャンクを2つずつマージする。
+    マージでは両チャンクの先頭同士だけを compare_pair で比較するため、
+    比較回数は1段あたり高々 n 回、全体で約 n · log2(n / chunk_size) 回になる。
+    チャンクはランダムに分けるため、どのチャンクも軸の全域にわたり、隣り合う列は
+    境界付近だけでなく全体で入り組む。境界付近だけを比較するマージでは列の大半が
+    並ばないまま残るため、全要素をマージする（n = 64、chunk_size = 16 なら約 128 回で、
+    全ペア比較の 4032 回の約 3%）。
+    同じ段の全マージの次の比較はまとめて並列に問い合わせる（store があれば
+    compare_many に一括で渡す）。マージ内の比較は前の結果に依存するため、
+    最後の段では高々 n 回の逐次の呼び出しが残る。
+
+    Returns:
+        (sorted_items, {"listwise": チャンクごとの結果, "comparisons": 比較結果のリスト})
+    """
+    if rng is None:
+        rng = random.Random()
+    shuffled = list(items)
+    rng.shuffle(shuffled)
+    by_no = {item["no"]: item for item in items}
+
+    async def rank_chunk(chunk: list[dict]) -> dict:
+        async with maybe_acquire(semaphore):
+            result = await rank_listwise(client, chunk, criterion)
+            repaired = await repair_listwise(client, chunk, criterion, result)
+        return {
+            **result,
+            "ranking": repaired["ranking"],
+            "validation": repaired["validation"],
+            "unresolved": repaired["unresolved"],
+            "repair_usage": repaired["usage"],
+            "repairs": repaired["repairs"],
+        }
+
+    listwise_results = await asyncio.gather(
+        *(rank_chunk(chunk) for chunk in _chunks(shuffled, chunk_size))
+    )
+    runs = [[by_no[no] for no in r["ranking"]] for r in listwise_results]
+
+    comparisons: list[PairwiseResult] = []
+
+    async def compare_many(pairs: list[tuple[dict, dict]]) -> list[str]:
+        if store is not None:
+            results = await store.compare_many(
+                client, pairs, criterion, semaphore=semaphore
+            )
+        else:
+            results = await asyncio.gather(
+                *(
+                    compare_pair(client, a, b, criterion, semaphore=semaphore)
+                    for a, b in pairs
+                )
+            )
+        comparisons.extend(results)
+        return [result.winner for result in results]
+
+    while len(runs) > 1:
+        runs = await _merge_level(runs, compare_many)
+    if store is not None:
+        store.save()
+    sorted_items = runs[0] if runs else []
+    return sorted_items, {
+        "listwise": list(listwise_results),
+        "comparisons": comparisons,
+    }
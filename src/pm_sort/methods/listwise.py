@@ -1,24 +1,41 @@
+import asyncio
+import math
+import re
+
 from openai import AsyncOpenAI
+from scipy.stats import kendalltau
 
-from ..core.api import call_with_retry, extract_reasoning_summary, extract_usage
+from ..core.api import (
+    Usage,
+    call_with_retry,
+    extract_reasoning_summary,
+    extract_usage,
+    maybe_acquire,
+)
 from ..core.config import get_model
 from ..core.criteria import Criterion
+from .mirror import reject_mirror_query
 
 
-async def rank_listwise(
-    client: AsyncOpenAI,
-    pms: list[dict],
-    criterion: Criterion,
-) -> dict:
-    """全員を1プロンプトに入れてソートさせる。"""
+def _listwise_prompt(pms: list[dict], criterion: Criterion) -> str:
     pms_text = "\n".join(f"{p['no']}. {p['name']}" for p in pms)
-    prompt = (
+    return (
         f"以下の{len(pms)}人の内閣総理大臣を「{criterion.left} ↔ {criterion.right}」の軸で並べ替えてください。\n"
         f"{criterion.description}\n\n"
         f"{pms_text}\n\n"
         f"{criterion.left}寄りの人物から{criterion.right}寄りの人物の順に、番号のみをカンマ区切りで出力してください。"
     )
 
+
+async def rank_listwise(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+) -> dict:
+    """全員を1プロンプトに入れてソートさせる。"""
+    reject_mirror_query(criterion)
+    prompt = _listwise_prompt(pms, criterion)
+
     r, elapsed, effort = await call_with_retry(client, model=get_model(), input=prompt)
     return {
         "raw_response": r.output_text,
@@ -31,3 +48,299 @@ async def rank_listwise(
         "reasoning_effort": effort,
         "reasoning_summary": extract_reasoning_summary(r),
     }
+
+
+# ---------------------------------------------------------------------------
+# 出力の検証と部分修復
+# ---------------------------------------------------------------------------
+
+# 「挿入する番号: 直前に来る番号」の行
+_INSERTION_PATTERN = re.compile(r"^\s*(\d+)\s*[:：→]\s*(\d+)\s*$", re.MULTILINE)
+
+
+def validate_listwise(raw_response: str, nos: list[int]) -> dict:
+    """リストワイズ出力を検証し、欠落・重複・存在しない番号を洗い出す。
+
+    重複した番号は位置が確定できないため、欠落と同じく修復対象として order から除く。
+
+    Returns:
+        {"order": 1回だけ現れた既知の番号の出力順, "missing", "duplicates", "unknown",
+         "valid": 完全な順列になっているか}
+    """
+    expected = set(nos)
+    numbers = [int(x) for x in re.findall(r"\d+", raw_response or "")]
+    counts: dict[int, int] = {}
+    for no in numbers:
+        counts[no] = counts.get(no, 0) + 1
+
+    duplicates = sorted(no for no, c in counts.items() if c > 1 and no in expected)
+    unknown = sorted(no for no in counts if no not in expected)
+    order = [no for no in numbers if counts[no] == 1 and no in expected]
+    missing = sorted(expected - set(counts))
+    return {
+        "order": order,
+        "missing": missing,
+        "duplicates": duplicates,
+        "unknown": unknown,
+        "valid": not missing and not duplicates and not unknown,
+    }
+
+
+def _insert_items(order: list[int], raw: str, faulty: list[int]) -> list[int]:
+    """「番号: 直前の番号（先頭なら0）」の指示どおりに faulty の番号を挿入する。
+
+    直前の番号がまだ挿入されていない場合に備え、挿入できなくなるまで繰り返す。
+    """
+    pending = {}
+    for match in _INSERTION_PATTERN.finditer(raw or ""):
+        no, anchor = int(match.group(1)), int(match.group(2))
+        if no in faulty:
+            pending.setdefault(no, anchor)
+
+    order = list(order)
+    progress = True
+    while pending and progress:
+        progress = False
+        for no, anchor in list(pending.items()):
+            if anchor == 0:
+                order.insert(0, no)
+            elif anchor in order:
+                order.insert(order.index(anchor) + 1, no)
+            else:
+                continue
+            del pending[no]
+            progress = True
+    return order
+
+
+async def repair_listwise(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    result: dict,
+    *,
+    max_attempts: int = 2,
+) -> dict:
+    """rank_listwise の出力の欠落・重複した人物だけを、追加の短いプロンプトで正しい位置に挿入する。
+
+    出力のうち1回だけ現れた番号の並びを確定済みの順位として提示し、
+    修復対象の各人物について「直前に来る人物の番号」だけを回答させる。
+    max_attempts 回試しても位置が決まらなかった人物は末尾に置き、"unresolved" に記録する。
+
+    Returns:
+        {"ranking": 左寄り→右寄りの完全な番号リスト, "validation", "unresolved",
+         "usage": 修復呼び出しの合計使用量, "repairs": 各呼び出しの記録}
+    """
+    reject_mirror_query(criterion)
+    pms_by_no = {p["no"]: p for p in pms}
+    validation = validate_listwise(result["raw_response"], list(pms_by_no))
+    order = validation["order"]
+    faulty = validation["missing"] + validation["duplicates"]
+
+    repairs: list[dict] = []
+    for _ in range(max_attempts):
+        faulty = [no for no in faulty if no not in order]
+        if not faulty:
+            break
+        ordered_text = "\n".join(f"{no}. {pms_by_no[no]['name']}" for no in order)
+        faulty_text = "\n".join(f"{no}. {pms_by_no[no]['name']}" for no in faulty)
+        prompt = (
+            f"以下は内閣総理大臣を「{criterion.left} ↔ {criterion.right}」の軸で"
+            f"{criterion.left}寄りから{criterion.right}寄りの順に並べたリストです。\n"
+            f"{criterion.description}\n\n"
+            f"{ordered_text}\n\n"
+            f"次の人物をこのリストの適切な位置に挿入してください。\n\n"
+            f"{faulty_text}\n\n"
+            f"各人物について1行ずつ「挿入する人物の番号: 直前に来る人物の番号」の形式で、"
+            f"先頭に置く場合は直前の番号を0として、番号のみで回答してください。"
+        )
+        r, elapsed, effort = await call_with_retry(
+            client, model=get_model(), input=prompt
+        )
+        order = _insert_items(order, r.output_text, faulty)
+        repairs.append(
+            {
+                "faulty": faulty,
+                "raw_response": r.output_text,
+                "prompt": prompt,
+                "usage": extract_usage(r).to_dict(),
+                "elapsed_seconds": round(elapsed, 3),
+                "response_id": r.id,
+                "model": r.model,
+                "created_at": str(r.created_at),
+                "reasoning_effort": effort,
+                "reasoning_summary": extract_reasoning_summary(r),
+            }
+        )
+
+    unresolved = [no for no in faulty if no not in order]
+    usage = Usage()
+    for record in repairs:
+        usage = usage + Usage.from_dict(record["usage"])
+    return {
+        "ranking": order + unresolved,
+        "validation": validation,
+        "unresolved": unresolved,
+        "usage": usage.to_dict(),
+        "repairs": repairs,
+    }
+
+
+# ---------------------------------------------------------------------------
+# スライディングウィンドウ方式（RankGPT 風）
+# ---------------------------------------------------------------------------
+
+
+def _window_order(raw: str, window: list[int]) -> list[int]:
+    """ウィンドウ内の番号だけを出力順に取り出す。
+
+    ウィンドウ外の番号と重複は無視し、出力されなかった番号は元の相対順で末尾に続ける。
+    """
+    members = set(window)
+    seen: list[int] = []
+    for no in (int(x) for x in re.findall(r"\d+", raw or "")):
+        if no in members and no not in seen:
+            seen.append(no)
+    return seen + [no for no in window if no not in seen]
+
+
+async def _rank_window(
+    client: AsyncOpenAI,
+    pms_by_no: dict[int, dict],
+    window: list[int],
+    criterion: Criterion,
+    *,
+    semaphore: asyncio.Semaphore | None,
+) -> tuple[list[int], dict]:
+    reject_mirror_query(criterion)
+    prompt = _listwise_prompt([pms_by_no[no] for no in window], criterion)
+    async with maybe_acquire(semaphore):
+        r, elapsed, effort = await call_with_retry(
+            client, model=get_model(), input=prompt
+        )
+    record = {
+        "window": window,
+        "raw_response": r.output_text,
+        "prompt": prompt,
+        "usage": extract_usage(r).to_dict(),
+        "elapsed_seconds": round(elapsed, 3),
+        "response_id": r.id,
+        "model": r.model,
+        "created_at": str(r.created_at),
+        "reasoning_effort": effort,
+        "reasoning_summary": extract_reasoning_summary(r),
+    }
+    return _window_order(r.output_text, window), record
+
+
+async def rank_listwise_windowed(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    window_size: int = 20,
+    stride: int = 10,
+    max_passes: int | None = None,
+    single_shot: dict | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict:
+    """重なりのあるウィンドウごとに並べ替えさせ、全体のランキングに統合する。
+
+    pms の並び（事前順位があればその順）を初期順位とし、幅 window_size のウィンドウを
+    stride ずつずらしながら各ウィンドウ内を並べ替える。互いに重ならないウィンドウは
+    同じラウンドで並列に実行するため、1パスはおよそ ceil(window_size / stride) ラウンドになる。
+    順位が変化しなくなるか max_passes（省略時は ceil(n / stride)）に達したら終了する。
+
+    single_shot に rank_listwise の結果を渡すと、全員を1プロンプトに入れた結果との
+    Kendall τ を "agreement" に記録する。pms が1人以下なら API を呼ばずに返す。
+
+    Returns:
+        {"ranking": 左寄り→右寄りの番号リスト, "calls", "rounds", "passes",
+         "usage", "elapsed_seconds", "agreement", "windows": 各呼び出しの記録}
+    """
+    if stride <= 0 or stride > window_size:
+        raise ValueError("stride は 1 以上 window_size 以下にしてください")
+
+    pms_by_no = {p["no"]: p for p in pms}
+    order = [p["no"] for p in pms]
+    n = len(order)
+    if n <= 1:
+        # 並べ替える対象がないため API を呼ばない
+        return {
+            "ranking": order,
+            "calls": 0,
+            "rounds": 0,
+            "passes": 0,
+            "usage": Usage().to_dict(),
+            "elapsed_seconds": 0.0,
+            "agreement": None,
+            "windows": [],
+        }
+    if max_passes is None:
+        max_passes = max(1, math.ceil(n / stride))
+
+    starts = list(range(0, max(n - window_size, 0) + 1, stride))
+    if starts[-1] + window_size < n:
+        starts.append(n - window_size)
+    # 互いに重ならないウィンドウを同じフェーズにまとめる（各フェーズ内は開始位置順）
+    phases: list[list[int]] = []
+    for start in starts:
+        for phase in phases:
+            if phase[-1] + window_size <= start:
+                phase.append(start)
+                break
+        else:
+            phases.append([start])
+
+    windows: list[dict] = []
+    rounds = passes = 0
+    while passes < max_passes:
+        before = list(order)
+        for phase_starts in phases:
+            outcomes = await asyncio.gather(
+                *(
+                    _rank_window(
+                        client,
+                        pms_by_no,
+                        order[s : s + window_size],
+                        criterion,
+                        semaphore=semaphore,
+                    )
+                    for s in phase_starts
+                )
+            )
+            for s, (window_order, record) in zip(phase_starts, outcomes):
+                order[s : s + len(window_order)] = window_order
+                windows.append(record)
+            rounds += 1
+        passes += 1
+        if order == before:
+            break
+
+    usage = Usage()
+    for record in windows:
+        usage = usage + Usage.from_dict(record["usage"])
+
+    agreement = None
+    if single_shot is not None:
+        single_position: dict[int, int] = {}
+        for no in (int(x) for x in re.findall(r"\d+", single_shot["raw_response"])):
+            single_position.setdefault(no, len(single_position))
+        common = [no for no in order if no in single_position]
+        if len(common) >= 2:
+            agreement = float(
+                kendalltau(
+                    range(len(common)), [single_position[no] for no in common]
+                ).statistic
+            )
+
+    return {
+        "ranking": order,
+        "calls": len(windows),
+        "rounds": rounds,
+        "passes": passes,
+        "usage": usage.to_dict(),
+        "elapsed_seconds": round(sum(w["elapsed_seconds"] for w in windows), 3),
+        "agreement": agreement,
+        "windows": windows,
+    }
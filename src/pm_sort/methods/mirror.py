@@ -0,0 +1,168 @@
+import re
+
+from ..core.api import Usage
+from ..core.cache import load_results, nested_int_keys
+from ..core.criteria import Criterion
+
+_FLIPPED_WINNER = {"A": "B", "B": "A"}
+
+# 元の基準の単一ペアの比較結果を探すキャッシュ（全ペア比較 → ComparisonStore の保存結果の順）
+_PAIRWISE_EXPERIMENTS = ("pairwise", "pairwise/store")
+
+
+def reject_mirror_query(criterion: Criterion) -> None:
+    """左右を入れ替えた基準で API を呼ぼうとしたら ValueError を送出する。
+
+    入れ替えた基準の結果は元の基準の結果から導出するため、1件ずつ導出できない
+    （複数人・複数軸をまとめて問い合わせる）関数の先頭で使う。
+    """
+    if criterion.mirror_of is not None:
+        raise ValueError(
+            f"{criterion.name!r} は {criterion.mirror_of!r} の左右を入れ替えた基準です。"
+            "API を呼ばずに load_mirrored_results または ComparisonStore.from_cache で"
+            "元の基準の結果から導出してください"
+        )
+
+
+def _mirrored_entry(entry: dict, base_name: str) -> dict:
+    """導出した結果に "mirrored_from"（元の基準の name）を付け、使用量と所要時間を 0 にする。"""
+    return {
+        **entry,
+        "usage": Usage().to_dict(),
+        "elapsed_seconds": 0.0,
+        "mirrored_from": base_name,
+    }
+
+
+def mirror_pair_results(pair_results: dict, base_name: str) -> dict:
+    """同じ提示順のまま winner を反転した pair_results を返す（INVALID はそのまま）。
+
+    元の基準で「a が b より右寄り」なら、入れ替えた基準では「a が b より左寄り」になるため、
+    A ↔ B を反転すれば API を呼ばずに同じ問いへの回答が得られる。
+    """
+    return {
+        a: {
+            b: {
+                **_mirrored_entry(entry, base_name),
+                "winner": _FLIPPED_WINNER.get(entry["winner"], entry["winner"]),
+            }
+            for b, entry in inner.items()
+        }
+        for a, inner in pair_results.items()
+    }
+
+
+def mirror_pointwise_results(results: list[dict], base_name: str) -> list[dict]:
+    """スコアを 100 − s にした結果を返す（パース失敗の -1 はそのまま）。"""
+    return [
+        {
+            **_mirrored_entry(r, base_name),
+            "score": 100 - r["score"] if 0 <= r["score"] <= 100 else r["score"],
+        }
+        for r in results
+    ]
+
+
+def mirror_listwise_result(result: dict, base_name: str) -> dict:
+    """出力された番号の並びを逆順にした結果を返す。
+
+    raw_response は逆順の番号をカンマ区切りにしたものに置き換え、元の出力は
+    "mirrored_raw_response" に残す。
+    """
+    numbers = re.findall(r"\d+", result["raw_response"] or "")
+    return {
+        **_mirrored_entry(result, base_name),
+        "raw_response": ",".join(reversed(numbers)),
+        "mirrored_raw_response": result["raw_response"],
+    }
+
+
+def mirror_kwiksort_run(run: dict, base_name: str) -> dict:
+    """KwikSort の実行結果のランキングを逆順にし、比較ログの winner を反転する。"""
+    return {
+        **run,
+        "ranking": list(reversed(run["ranking"])),
+        "comparisons": [
+            {
+                **_mirrored_entry(c, base_name),
+                "winner": _FLIPPED_WINNER.get(c["winner"], c["winner"]),
+            }
+            if "winner" in c
+            else c
+            for c in run.get("comparisons", [])
+        ],
+        "mirrored_from": base_name,
+    }
+
+
+def load_mirrored_results(
+    experiment: str,
+    criterion: Criterion,
+    name: str | None = None,
+    *,
+    model: str | None = None,
+):
+    """左右を入れ替えた基準の結果を、元の基準のキャッシュから導出して返す。
+
+    experiment は "pointwise" / "listwise" / "pairwise" / "kwiksort"。
+    "kwiksort" では name に seed のファイル名（例: "seed_0"）を指定する。
+    入れ替えた基準自身の名前のキャッシュは読まない。元の基準のキャッシュがなければ None。
+    """
+    if criterion.mirror_of is None:
+        raise ValueError(f"{criterion.name!r} は左右を入れ替えた基準ではありません")
+    base = criterion.mirror_of
+
+    if experiment == "kwiksort":
+        if name is None:
+            raise ValueError("kwiksort では seed のファイル名を指定してください")
+        run = load_results(f"pairwise/kwiksort/{base}", name, model=model)
+        return mirror_kwiksort_run(run, base) if run is not None else None
+
+    cached = load_results(experiment, base, model=model)
+    if cached is None:
+        return None
+    if experiment == "pointwise":
+        return mirror_pointwise_results(cached, base)
+    if experiment == "listwise":
+        return mirror_listwise_result(cached, base)
+    if experiment == "pairwise":
+        return mirror_pair_results(nested_int_keys(cached), base)
+    raise ValueError(f"未対応の実験です: {experiment!r}")
+
+
+def mirrored_pair_entry(
+    criterion: Criterion, no_a: int, no_b: int, *, model: str | None = None
+) -> dict:
+    """左右を入れ替えた基準での (no_a, no_b) の比較結果を、元の基準のキャッシュから導出する。
+
+    元の基準の全ペア比較、ComparisonStore の保存結果の順に同じ提示順の比較結果を探し、
+    winner を反転して返す（推定エントリは使わない）。見つからなければ API を呼ばずに
+    ValueError を送出する。呼び出しごとにキャッシュを読むため、多数のペアには
+    ComparisonStore.from_cache を使う。
+    """
+    base = criterion.mirror_of
+    for experiment in _PAIRWISE_EXPERIMENTS:
+        cached = load_results(experiment, base, model=model) or {}
+        entry = cached.get(str(no_a), {}).get(str(no_b))
+        if entry is not None and not entry.get("inferred"):
+            return mirror_pair_results({no_a: {no_b: entry}}, base)[no_a][no_b]
+    raise ValueError(
+        f"元の基準 {base!r} に ({no_a}, {no_b}) の比較結果がありません。"
+        "左右を入れ替えた基準では API を呼ばないため、元の基準で比較してください"
+    )
+
+
+def mirrored_pointwise_entry(
+    criterion: Criterion, no: int, *, model: str | None = None
+) -> dict:
+    """左右を入れ替えた基準での no の評価結果を、元の基準のキャッシュから導出する。
+
+    スコアは 100 − s にする。元の基準に評価結果がなければ API を呼ばずに ValueError を送出する。
+    """
+    for result in load_mirrored_results("pointwise", criterion, model=model) or []:
+        if result["no"] == no:
+            return result
+    raise ValueError(
+        f"元の基準 {criterion.mirror_of!r} に {no} の評価結果がありません。"
+        "左右を入れ替えた基準では API を呼ばないため、元の基準で評価してください"
+    )
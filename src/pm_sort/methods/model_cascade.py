@@ -0,0 +1,195 @@
+import asyncio
+from itertools import combinations
+
+from openai import AsyncOpenAI
+
+from ..core.api import calculate_cost
+from ..core.cache import load_results, nested_int_keys, save_results
+from ..core.config import MODEL_CASCADE
+from ..core.criteria import Criterion
+from .pairwise.compare import compare_pair, pair_needs_escalation
+from .pointwise import pointwise_needs_escalation, score_pointwise
+
+# モデルカスケードの各段の結果を保存する実験名（通常の実行結果とは別に保存する）
+CASCADE_EXPERIMENTS = {"pairwise": "cascade/pairwise", "pointwise": "cascade/pointwise"}
+
+
+def load_cascade_results(
+    experiment: str, criterion_name: str, *, models: tuple[str, ...] = MODEL_CASCADE
+) -> dict | list:
+    """各モデルの段の結果を統合したビューを返す。
+
+    後ろの（強い）モデルの結果ほど優先する。各結果の "model" で、どの段の結果かがわかる。
+    experiment は "pairwise"（pair_results を返す）または "pointwise"（番号順のリストを返す）。
+    """
+    merged: dict = {}
+    for model in models:
+        cached = load_results(
+            CASCADE_EXPERIMENTS[experiment], criterion_name, model=model
+        )
+        if not cached:
+            continue
+        if experiment == "pairwise":
+            for a, inner in nested_int_keys(cached).items():
+                merged.setdefault(a, {}).update(inner)
+        else:
+            merged.update({r["no"]: r for r in cached})
+    if experiment == "pairwise":
+        return merged
+    return [merged[no] for no in sorted(merged)]
+
+
+def _save_tier(experiment: str, criterion_name: str, model: str, data) -> None:
+    """段の結果を、そのモデルの既存の結果に追記して保存する。"""
+    key = CASCADE_EXPERIMENTS[experiment]
+    cached = load_results(key, criterion_name, model=model)
+    if experiment == "pairwise":
+        merged = nested_int_keys(cached) if cached else {}
+        for a, inner in data.items():
+            merged.setdefault(a, {}).update(inner)
+    else:
+        by_no = {r["no"]: r for r in cached or []}
+        by_no.update({r["no"]: r for r in data})
+        merged = [by_no[no] for no in sorted(by_no)]
+    save_results(key, criterion_name, merged, model=model)
+
+
+async def compare_pairs_model_cascade(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    models: tuple[str, ...] = MODEL_CASCADE,
+    pairs: list[tuple[int, int]] | None = None,
+    prior: dict[int, float] | None = None,
+    boundary_band: float = 5.0,
+    uncertainty_threshold: int = 1,
+    semaphore: asyncio.Semaphore | None = None,
+    save: bool = True,
+) -> tuple[dict, dict]:
+    """安いモデルで全ペアを両方向比較し、判定が怪しいペアだけ強いモデルで比較し直す。
+
+    models の先頭のモデルから順に、INVALID・両方向の不一致・事前スコアが近い・
+    迷いを示す表現を含む（pair_needs_escalation の条件に当たる）ペアだけを次の段へ送る。
+    save=True のときは各段の結果を cascade/pairwise/<criterion>.json として
+    そのモデルのディレクトリに保存する（統合ビューは load_cascade_results）。
+
+    Returns:
+        (pair_results, stats) — pair_results は後段の結果を優先した統合ビュー、
+        stats は {"pairs", "calls_by_model", "escalated_by_model", "cost_by_model"}。
+    """
+    pms_by_no = {p["no"]: p for p in pms}
+    if pairs is None:
+        pairs = list(combinations(sorted(pms_by_no), 2))
+
+    merged: dict = {}
+    stats: dict = {
+        "pairs": len(pairs),
+        "calls_by_model": {},
+        "escalated_by_model": {},
+        "cost_by_model": {},
+    }
+    pending = list(pairs)
+    for level, model in enumerate(models):
+        if not pending:
+            break
+        results = await asyncio.gather(
+            *[
+                compare_pair(
+                    client,
+                    pms_by_no[x],
+                    pms_by_no[y],
+                    criterion,
+                    semaphore=semaphore,
+                    model=model,
+                )
+                for a, b in pending
+                for x, y in ((a, b), (b, a))
+            ]
+        )
+        tier: dict = {}
+        for result in results:
+            tier.setdefault(result.no_a, {})[result.no_b] = result.to_dict()
+        for a, inner in tier.items():
+            merged.setdefault(a, {}).update(inner)
+        if save:
+            _save_tier("pairwise", criterion.name, model, tier)
+
+        stats["calls_by_model"][model] = len(results)
+        stats["cost_by_model"][model] = calculate_cost(
+            [e for inner in tier.values() for e in inner.values()]
+        )
+
+        if level + 1 == len(models):
+            break
+        pending = [
+            (a, b)
+            for (a, b), forward, backward in zip(pending, results[::2], results[1::2])
+            if pair_needs_escalation(
+                forward,
+                backward,
+                prior=prior,
+                boundary_band=boundary_band,
+                uncertainty_threshold=uncertainty_threshold,
+            )
+        ]
+        stats["escalated_by_model"][model] = len(pending)
+
+    return merged, stats
+
+
+async def score_pointwise_model_cascade(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    models: tuple[str, ...] = MODEL_CASCADE,
+    midpoint_band: float = 10.0,
+    semaphore: asyncio.Semaphore | None = None,
+    save: bool = True,
+) -> tuple[list[dict], dict]:
+    """安いモデルで全員を評価し、パース失敗・スコアが中央付近の人物だけ強いモデルで評価し直す。
+
+    次の段へ送る条件は pointwise_needs_escalation（スコアが 50 ± midpoint_band 点以内）。
+    save=True のときは各段の結果を cascade/pointwise/<criterion>.json として
+    そのモデルのディレクトリに保存する（統合ビューは load_cascade_results）。
+
+    Returns:
+        (results, stats) — results は後段の結果を優先した pms 順の統合ビュー、
+        stats は {"items", "calls_by_model", "escalated_by_model", "cost_by_model"}。
+    """
+    merged: dict[int, dict] = {}
+    stats: dict = {
+        "items": len(pms),
+        "calls_by_model": {},
+        "escalated_by_model": {},
+        "cost_by_model": {},
+    }
+    pending = list(pms)
+    for level, model in enumerate(models):
+        if not pending:
+            break
+        results = await asyncio.gather(
+            *[
+                score_pointwise(client, pm, criterion, semaphore=semaphore, model=model)
+                for pm in pending
+            ]
+        )
+        tier = [result.to_dict() for result in results]
+        merged.update({r["no"]: r for r in tier})
+        if save:
+            _save_tier("pointwise", criterion.name, model, tier)
+
+        stats["calls_by_model"][model] = len(results)
+        stats["cost_by_model"][model] = calculate_cost(tier)
+
+        if level + 1 == len(models):
+            break
+        pending = [
+            pm
+            for pm, result in zip(pending, results)
+            if pointwise_needs_escalation(result, midpoint_band=midpoint_band)
+        ]
+        stats["escalated_by_model"][model] = len(pending)
+
+    return [merged[pm["no"]] for pm in pms], stats
@@ -1,3 +1,51 @@
-from .analyze import find_transitivity_violations, resolve_winner, win_count_sort
-from .compare import PairwiseResult, compare_pair
-from .sort import kwiksort_cached, kwiksort_live
+from .analyze import (
+    count_transitivity_violations,
+    find_preference_components,
+    find_transitivity_violations,
+    iter_transitivity_violations,
+    kemeny_ranking,
+    resolve_winner,
+    win_count_sort,
+)
+from .bradley_terry import fit_bradley_terry
+from .cascade import (
+    EFFORT_CASCADE,
+    cached_reasoning_baseline,
+    compare_pairs_effort_cascade,
+)
+from .compare import (
+    PairwiseResult,
+    compare_pair,
+    compare_pairs_adaptive,
+    compare_pairs_banded,
+    estimate_position_bias,
+    pair_needs_escalation,
+    pairwise_parse_stats,
+)
+from .incremental import IncrementalAnalysis
+from .matrix import build_winner_matrix, resolve_winner_matrix
+from .multi import (
+    MULTI_EXPERIMENT,
+    compare_pair_multi,
+    compare_pairs_multi,
+    evaluate_multi_criterion,
+)
+from .pivot import (
+    PIVOT_STRATEGIES,
+    prior_from_listwise,
+    prior_from_pointwise,
+    select_pivot,
+)
+from .sort import (
+    evaluate_pivot_strategies,
+    kwiksort_batch,
+    kwiksort_cached,
+    kwiksort_live,
+)
+from .store import ComparisonStore
+from .tournament import (
+    TOURNAMENT_METHODS,
+    competition_rank,
+    tournament_scores,
+    tournament_scores_from_matrix,
+)
@@ -1,5 +1,18 @@
+from collections.abc import Iterator
 from itertools import combinations
 
+import numpy as np
+
+from .matrix import (
+    WIN_A,
+    WIN_B,
+    beats_matrix,
+    build_winner_matrix,
+    count_directed_triangles,
+    iter_directed_triangles,
+    resolve_winner_matrix,
+)
+
 
 def resolve_winner(pair_results: dict, a: int, b: int) -> str:
     """両方向の比較結果から最終勝者を導出する。
@@ -51,6 +64,31 @@ def win_count_sort(pair_results: dict) -> list[tuple[int, int, float]]:
     return result_list
 
 
+def _beats_graph(pair_results: dict) -> tuple[np.ndarray, np.ndarray]:
+    """resolve_winner と同じ規則で勝敗を確定したブール隣接行列を作る。"""
+    nos, W = build_winner_matrix(pair_results)
+    return nos, beats_matrix(resolve_winner_matrix(W))
+
+
+def count_transitivity_violations(pair_results: dict) -> int:
+    """a>b, b>c, c>a となる三すくみサイクルの数を行列積で数える。"""
+    _, beats = _beats_graph(pair_results)
+    return count_directed_triangles(beats)
+
+
+def iter_transitivity_violations(
+    pair_results: dict,
+) -> Iterator[tuple[int, int, int]]:
+    """三すくみサイクルを1件ずつ生成する（リストを作らない）。
+
+    順序・正規化は find_transitivity_violations と同じ。
+    """
+    nos, beats = _beats_graph(pair_results)
+    nos_list = nos.tolist()
+    for i, j, k in iter_directed_triangles(beats):
+        yield nos_list[i], nos_list[j], nos_list[k]
+
+
 def find_transitivity_violations(
     pair_results: dict,
 ) -> list[tuple[int, int, int]]:
@@ -58,34 +96,204 @@ def find_transitivity_violations(
 
     各サイクルは1回だけカウントされ、最小要素が先頭になるよう正規化される。
     """
-    # 勝敗グラフを構築
-    wins: dict[int, set[int]] = {}
-    all_nos = sorted(pair_results.keys())
-    for a, b in combinations(all_nos, 2):
-        result = resolve_winner(pair_results, a, b)
-        if result == "A":
-            wins.setdefault(a, set()).add(b)
-        elif result == "B":
-            wins.setdefault(b, set()).add(a)
-
-    violations: set[tuple[int, int, int]] = set()
-    for a, b, c in combinations(all_nos, 3):
-        a_wins = wins.get(a, set())
-        b_wins = wins.get(b, set())
-        c_wins = wins.get(c, set())
-        # a > b > c > a のサイクルをチェック
-        if b in a_wins and c in b_wins and a in c_wins:
-            cycle = (a, b, c)
-            min_val = min(cycle)
-            idx = cycle.index(min_val)
-            normalized = cycle[idx:] + cycle[:idx]
-            violations.add(normalized)
-        # a > c > b > a のサイクルをチェック
-        if c in a_wins and b in c_wins and a in b_wins:
-            cycle = (a, c, b)
-            min_val = min(cycle)
-            idx = cycle.index(min_val)
-            normalized = cycle[idx:] + cycle[:idx]
-            violations.add(normalized)
-
-    return sorted(violations)
+    return list(iter_transitivity_violations(pair_results))
+
+
+# ---------------------------------------------------------------------------
+# Kemeny 合意ランキング（最小フィードバック辺集合）
+# ---------------------------------------------------------------------------
+
+
+def _disagreement_matrix(W: np.ndarray, weights: str) -> np.ndarray:
+    """C[i, j] = i を j より上位（勝者側）に置いたときに食い違う判定の数。"""
+    if weights == "resolved":
+        return (resolve_winner_matrix(W) < 0).astype(np.int64)
+    if weights == "directional":
+        # i が j に負けた片方向の判定数（llm(i, j) で B 勝ち + llm(j, i) で A 勝ち）
+        return (W == WIN_B).astype(np.int64) + (W.T == WIN_A).astype(np.int64)
+    raise ValueError(f"未知の weights です: {weights!r}")
+
+
+def _ranking_cost(C: np.ndarray, order: np.ndarray) -> int:
+    return int(np.triu(C[np.ix_(order, order)], 1).sum())
+
+
+def _insertion_local_search(C: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """1要素の挿入移動で改善できなくなるまで、最良の移動を適用し続ける。
+
+    位置 p の要素を位置 q に移す全 (p, q) の差分を、
+    M = C_π − C_πᵀ の行方向累積和から n × n 行列として一度に計算する。
+    """
+    n = len(order)
+    pos = np.arange(n)
+    while True:
+        Cp = C[np.ix_(order, order)]
+        M = Cp - Cp.T
+        cs = np.zeros((n, n + 1), dtype=np.int64)
+        np.cumsum(M, axis=1, out=cs[:, 1:])
+        diag = cs[pos, pos][:, None]
+        diag_next = cs[pos, pos + 1][:, None]
+        # q < p: 間の要素 π[q:p] より前に出る / q > p: π[p+1:q+1] より後ろに下がる
+        delta = np.where(pos[None, :] < pos[:, None], diag - cs[:, :n], 0)
+        delta = np.where(pos[None, :] > pos[:, None], -(cs[:, 1:] - diag_next), delta)
+        p, q = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[p, q] >= 0:
+            return order
+        order = np.insert(np.delete(order, p), q, order[p])
+
+
+def _branch_and_bound(C: np.ndarray, upper_order: np.ndarray) -> np.ndarray:
+    """先頭から1要素ずつ確定する深さ優先の分枝限定法で最適順序を求める。
+
+    下界は「確定済みコスト + 未確定ペアそれぞれの min(C[i, j], C[j, i]) の和」。
+    """
+    n = len(C)
+    pair_min = np.minimum(C, C.T)
+    best = {"cost": _ranking_cost(C, upper_order), "order": list(upper_order)}
+
+    def dfs(prefix: list[int], remaining: list[int], cost: int) -> None:
+        if not remaining:
+            if cost < best["cost"]:
+                best["cost"], best["order"] = cost, list(prefix)
+            return
+        rem = np.array(remaining)
+        bound = cost + int(np.triu(pair_min[np.ix_(rem, rem)], 1).sum())
+        if bound >= best["cost"]:
+            return
+        # 先頭に置いたときの追加コストが小さい順に分岐する
+        added = C[np.ix_(rem, rem)].sum(axis=1)
+        for idx in np.argsort(added, kind="stable"):
+            x = remaining[idx]
+            dfs(
+                prefix + [x],
+                remaining[:idx] + remaining[idx + 1 :],
+                cost + int(added[idx]),
+            )
+
+    dfs([], list(range(n)), 0)
+    return np.array(best["order"])
+
+
+def kemeny_ranking(
+    pair_results: dict,
+    initial: list[int] | None = None,
+    *,
+    weights: str = "resolved",
+    exact: bool = False,
+    exact_max_n: int = 12,
+) -> tuple[list[int], int]:
+    """ペアワイズ判定との食い違いが最小になるランキング（Kemeny 合意）を求める。
+
+    initial（首相番号のリスト、勝者側が先頭）を初期解として挿入移動の局所探索で改善する。
+    省略時は勝利数ソートの順位を初期解とする。exact=True かつ n <= exact_max_n のときは
+    局所探索の結果を上界として分枝限定法で厳密解を求める。
+
+    weights:
+        "resolved" — 両方向で一致したペアの勝敗に反する並びを1件と数える（TIE は0）
+        "directional" — 片方向ごとの判定に反する数を数える（1ペアあたり最大2）
+
+    Returns:
+        (ranking, disagreements) — ranking は win_count_sort と同じく勝者側（右寄り）が先頭。
+    """
+    nos, W = build_winner_matrix(pair_results)
+    C = _disagreement_matrix(W, weights)
+    index = {int(no): i for i, no in enumerate(nos)}
+
+    if initial is None:
+        initial = [no for no, _, _ in win_count_sort(pair_results)]
+    order = np.array([index[no] for no in initial], dtype=np.int64)
+    if len(order) != len(nos):
+        raise ValueError("initial は全員を1回ずつ含む必要があります")
+
+    order = _insertion_local_search(C, order)
+    if exact and len(order) <= exact_max_n:
+        order = _branch_and_bound(C, order)
+    return [int(nos[i]) for i in order], _ranking_cost(C, order)
+
+
+# ---------------------------------------------------------------------------
+# 強連結成分分解（矛盾の塊の検出）
+# ---------------------------------------------------------------------------
+
+
+def _tarjan_scc(adjacency: list[list[int]]) -> list[list[int]]:
+    """Tarjan のアルゴリズム（再帰なし）で強連結成分を求める。
+
+    成分は逆トポロジカル順（後続の成分が先）に返る。計算量は O(頂点数 + 辺数)。
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        # (頂点, 次に調べる隣接リストの位置) の明示的なスタック
+        work = [(root, 0)]
+        while work:
+            v, pos = work.pop()
+            if pos == 0:
+                index[v] = lowlink[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+            neighbors = adjacency[v]
+            while pos < len(neighbors):
+                w = neighbors[pos]
+                pos += 1
+                if index[w] == -1:
+                    work.append((v, pos))
+                    work.append((w, 0))
+                    break
+                if on_stack[w]:
+                    lowlink[v] = min(lowlink[v], index[w])
+            else:
+                if lowlink[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+    return components
+
+
+def find_preference_components(
+    pair_results: dict,
+) -> tuple[list[list[int]], list[tuple[int, int]]]:
+    """勝敗グラフを強連結成分に分解し、成分間の順序（縮約DAG）を返す。
+
+    resolve_winner で勝敗が確定したペアを「勝者 → 敗者」の辺とする有向グラフを作り、
+    互いに到達可能な人物の集合（＝どの順に並べても矛盾が残る塊）にまとめる。
+    三すくみに限らず、任意の長さの矛盾サイクルを含む塊を検出できる。
+
+    Returns:
+        (components, edges)
+        components — 各成分の首相番号リスト（成分内は番号順）。トポロジカル順に並び、
+            勝者側（右寄り）の成分が先頭。各成分の大きさは len(components[k])。
+        edges — 縮約DAGの辺 (k, l)：成分 k の誰かが成分 l の誰かに勝っている。
+            TIE のみで結ばれた成分間には辺がなく、順序は確定しない。
+    """
+    nos, beats = _beats_graph(pair_results)
+    adjacency = [np.flatnonzero(row).tolist() for row in beats]
+    # Tarjan は敗者側の成分から返すため反転して勝者側を先頭にする
+    components = _tarjan_scc(adjacency)[::-1]
+
+    component_of = np.empty(len(nos), dtype=np.int64)
+    for k, members in enumerate(components):
+        component_of[members] = k
+    src, dst = np.nonzero(beats)
+    cs, cd = component_of[src], component_of[dst]
+    between = cs != cd
+    edges = sorted({(int(a), int(b)) for a, b in zip(cs[between], cd[between])})
+
+    return [sorted(int(nos[i]) for i in members) for members in components], edges
@@ -0,0 +1,139 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .matrix import INVALID, WIN_A, WIN_B, build_winner_matrix
+from .tournament import competition_rank
+
+# Elo レーティングへの換算（強さの対数比 1 単位 = 400 / ln 10 点）
+ELO_SCALE = 400 / math.log(10)
+ELO_BASE = 1500.0
+
+
+def _win_counts(W: np.ndarray, ties: str) -> np.ndarray:
+    """片方向の勝敗行列から、i が j に勝った回数 wins[i, j] を数える。
+
+    1回の比較（llm(i, j)）を1試合とし、INVALID は ties="half" なら両者0.5勝、
+    ties="missing" なら試合なしとして扱う。
+    """
+    if ties not in ("half", "missing"):
+        raise ValueError(f"未知の ties です: {ties!r}")
+    wins = (W == WIN_A).astype(np.float64) + (W.T == WIN_B)
+    if ties == "half":
+        invalid = (W == INVALID).astype(np.float64)
+        wins += 0.5 * (invalid + invalid.T)
+    return wins
+
+
+def _fit_mm(
+    wins: np.ndarray,
+    *,
+    regularization: float,
+    max_iter: int = 1000,
+    tol: float = 1e-9,
+) -> np.ndarray:
+    """MM アルゴリズム（Hunter, 2004）で Bradley–Terry モデルの対数強さを推定する。
+
+    p_i ← W_i / Σ_j N_ij / (p_i + p_j) を全員同時に更新する。
+    対戦のあるペアには両側に regularization 勝ずつの仮想試合を加え、
+    全勝・全敗の人物でも発散しないようにする。
+    """
+    games = wins + wins.T
+    played = games > 0
+    wins = wins + regularization * played
+    games = games + 2 * regularization * played
+    total_wins = wins.sum(axis=1)
+
+    p = np.ones(len(wins))
+    for _ in range(max_iter):
+        denom = (games / (p[:, None] + p[None, :])).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            new_p = np.where(denom > 0, total_wins / denom, 1.0)
+        new_p /= np.exp(np.log(new_p).mean())
+        if np.max(np.abs(new_p - p)) < tol:
+            p = new_p
+            break
+        p = new_p
+    return np.log(p)
+
+
+def _bootstrap_worker(args: tuple) -> np.ndarray:
+    """ペア単位の復元抽出で Bradley–Terry を再推定する（プロセスプール用）。"""
+    pair_i, pair_j, wins_ij, wins_ji, n, regularization, seed, n_rounds = args
+    rng = np.random.default_rng(seed)
+    n_pairs = len(pair_i)
+    out = np.empty((n_rounds, n))
+    for r in range(n_rounds):
+        weight = np.bincount(rng.integers(0, n_pairs, n_pairs), minlength=n_pairs)
+        wins = np.zeros((n, n))
+        np.add.at(wins, (pair_i, pair_j), weight * wins_ij)
+        np.add.at(wins, (pair_j, pair_i), weight * wins_ji)
+        out[r] = _fit_mm(wins, regularization=regularization)
+    return out
+
+
+def fit_bradley_terry(
+    pair_results: dict,
+    *,
+    ties: str = "half",
+    regularization: float = 0.1,
+    n_bootstrap: int = 0,
+    ci: float = 0.95,
+    seed: int | None = None,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """全ペア比較データに Bradley–Terry モデルを当てはめ、強さ順のランキングを返す。
+
+    片方向の比較1回を1試合として扱う（ties は _win_counts を参照）。
+    n_bootstrap > 0 のときは、比較したペアを単位に復元抽出した再推定を
+    プロセスプールで並列に行い、対数強さのパーセンタイル信頼区間を付ける。
+
+    Returns:
+        [{"no", "rank", "log_strength", "elo", "ci_low", "ci_high"}, ...] を強さ降順で返す。
+        ci_low / ci_high は対数強さの信頼区間（n_bootstrap = 0 のときは None）。
+    """
+    nos, W = build_winner_matrix(pair_results)
+    n = len(nos)
+    wins = _win_counts(W, ties)
+    log_strength = _fit_mm(wins, regularization=regularization)
+
+    ci_low = ci_high = None
+    if n_bootstrap > 0:
+        pair_i, pair_j = np.nonzero(np.triu(wins + wins.T, 1))
+        workers = max_workers or os.cpu_count() or 1
+        chunks = np.array_split(np.arange(n_bootstrap), workers)
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        tasks = [
+            (
+                pair_i,
+                pair_j,
+                wins[pair_i, pair_j],
+                wins[pair_j, pair_i],
+                n,
+                regularization,
+                s,
+                len(chunk),
+            )
+            for s, chunk in zip(seeds, chunks)
+            if len(chunk) > 0
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            samples = np.concatenate(list(pool.map(_bootstrap_worker, tasks)))
+        alpha = (1 - ci) / 2
+        ci_low, ci_high = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+
+    ranks = competition_rank(log_strength)
+    order = np.lexsort((nos, -log_strength))
+    return [
+        {
+            "no": int(nos[i]),
+            "rank": int(ranks[i]),
+            "log_strength": float(log_strength[i]),
+            "elo": ELO_BASE + ELO_SCALE * float(log_strength[i]),
+            "ci_low": None if ci_low is None else float(ci_low[i]),
+            "ci_high": None if ci_high is None else float(ci_high[i]),
+        }
+        for i in order
+    ]
@@ -0,0 +1,126 @@
+import asyncio
+from itertools import combinations
+
+from openai import AsyncOpenAI
+
+from ...core.config import DEFAULT_REASONING_EFFORT
+from ...core.criteria import Criterion
+from .compare import compare_pair, pair_needs_escalation
+from .store import ComparisonStore
+
+# 思考量エスカレーションの既定の段階
+EFFORT_CASCADE = ("low", "medium", "high")
+
+
+def cached_reasoning_baseline(criterion_name: str) -> float | None:
+    """キャッシュ済みの比較から、DEFAULT_REASONING_EFFORT での1回あたりの平均推論トークン数を返す。
+
+    全ペア比較・ストア・KwikSort の比較ログを対象とし、推定・導出したエントリと
+    エスカレーションで得たエントリは除く。該当する結果がなければ None。
+    """
+    tokens = [
+        entry["usage"]["reasoning_tokens"]
+        for inner in ComparisonStore.from_cache(criterion_name).pair_results.values()
+        for entry in inner.values()
+        if entry.get("reasoning_effort") == DEFAULT_REASONING_EFFORT
+        and not entry.get("inferred")
+        and not entry.get("mirrored_from")
+        and not entry.get("escalation_path")
+    ]
+    return sum(tokens) / len(tokens) if tokens else None
+
+
+async def compare_pairs_effort_cascade(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    pairs: list[tuple[int, int]] | None = None,
+    efforts: tuple[str, ...] = EFFORT_CASCADE,
+    prior: dict[int, float] | None = None,
+    boundary_band: float = 5.0,
+    uncertainty_threshold: int = 1,
+    baseline_reasoning_tokens: float | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> tuple[dict, dict]:
+    """低い思考量で両方向を比較し、判定が怪しいペアだけ思考量を上げて比較し直す。
+
+    各ペアをまず efforts[0] で両方向比較し、pair_needs_escalation の条件に当たるペアだけ
+    次の段階の思考量で両方向とも比較し直す（最後の段階の結果はそのまま採用）。
+    各結果の escalation_path に、そのペアで試した思考量を順に記録する。
+
+    削減できた推論トークン数は、全比較を DEFAULT_REASONING_EFFORT で行った場合の
+    推定値との差として報告する。1回あたりの推論トークン数は baseline_reasoning_tokens
+    （省略時は cached_reasoning_baseline のキャッシュからの値）を使い、どちらもなければ
+    None とする。この実行でエスカレーションした比較は判定の難しいペアに偏るため、
+    基準には使わない。
+
+    Returns:
+        (pair_results, stats) — stats は {"pairs", "calls", "calls_by_effort",
+        "escalated_pairs", "reasoning_tokens", "reasoning_tokens_saved"}。
+    """
+    pms_by_no = {p["no"]: p for p in pms}
+    if pairs is None:
+        pairs = list(combinations(sorted(pms_by_no), 2))
+
+    pair_results: dict = {}
+    paths: dict[tuple[int, int], list[str]] = {pair: [] for pair in pairs}
+    calls_by_effort = {effort: 0 for effort in efforts}
+    reasoning_by_effort = {effort: 0 for effort in efforts}
+    escalated = set()
+
+    pending = list(pairs)
+    for level, effort in enumerate(efforts):
+        if not pending:
+            break
+        results = await asyncio.gather(
+            *[
+                compare_pair(
+                    client,
+                    pms_by_no[x],
+                    pms_by_no[y],
+                    criterion,
+                    semaphore=semaphore,
+                    reasoning_effort=effort,
+                )
+                for a, b in pending
+                for x, y in ((a, b), (b, a))
+            ]
+        )
+        calls_by_effort[effort] += len(results)
+        reasoning_by_effort[effort] += sum(r.usage.reasoning_tokens for r in results)
+
+        next_pending = []
+        for (a, b), forward, backward in zip(pending, results[::2], results[1::2]):
+            paths[(a, b)].append(effort)
+            for result in (forward, backward):
+                result.escalation_path = list(paths[(a, b)])
+                pair_results.setdefault(result.no_a, {})[result.no_b] = result.to_dict()
+            if level + 1 < len(efforts) and pair_needs_escalation(
+                forward,
+                backward,
+                prior=prior,
+                boundary_band=boundary_band,
+                uncertainty_threshold=uncertainty_threshold,
+            ):
+                next_pending.append((a, b))
+                escalated.add((a, b))
+        pending = next_pending
+
+    total_calls = sum(calls_by_effort.values())
+    total_reasoning = sum(reasoning_by_effort.values())
+    if baseline_reasoning_tokens is None:
+        baseline_reasoning_tokens = cached_reasoning_baseline(criterion.name)
+    saved = None
+    if baseline_reasoning_tokens is not None:
+        saved = round(2 * len(pairs) * baseline_reasoning_tokens - total_reasoning)
+
+    stats = {
+        "pairs": len(pairs),
+        "calls": total_calls,
+        "calls_by_effort": calls_by_effort,
+        "escalated_pairs": len(escalated),
+        "reasoning_tokens": total_reasoning,
+        "reasoning_tokens_saved": saved,
+    }
+    return pair_results, stats
@@ -1,18 +1,27 @@
 import asyncio
+import random
 import re
 from dataclasses import dataclass, field
+from itertools import combinations
 
 from openai import AsyncOpenAI
 
 from ...core.api import (
+    PARSE_MODE_JSON,
+    PARSE_MODE_JSON_FALLBACK,
+    PARSE_MODE_TEXT,
     Usage,
     call_with_retry,
     extract_reasoning_summary,
     extract_usage,
+    json_schema_format,
     maybe_acquire,
+    parse_json_output,
+    summarize_parse_modes,
 )
-from ...core.config import get_model
+from ...core.config import DEFAULT_REASONING_SUMMARY, get_model
 from ...core.criteria import Criterion
+from ..mirror import mirrored_pair_entry
 
 
 @dataclass
@@ -31,6 +40,8 @@ class PairwiseResult:
     created_at: str = ""
     reasoning_effort: str = ""
     reasoning_summary: str = ""
+    parse_mode: str = PARSE_MODE_TEXT
+    escalation_path: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         return {
@@ -46,8 +57,29 @@ class PairwiseResult:
             "created_at": self.created_at,
             "reasoning_effort": self.reasoning_effort,
             "reasoning_summary": self.reasoning_summary,
+            "parse_mode": self.parse_mode,
+            "escalation_path": list(self.escalation_path),
         }
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "PairwiseResult":
+        return cls(
+            no_a=d["no_a"],
+            no_b=d["no_b"],
+            winner=d["winner"],
+            raw_response=d.get("raw_response", ""),
+            prompt=d.get("prompt", ""),
+            usage=Usage.from_dict(d.get("usage") or {}),
+            elapsed_seconds=d.get("elapsed_seconds", 0.0),
+            response_id=d.get("response_id", ""),
+            model=d.get("model", ""),
+            created_at=d.get("created_at", ""),
+            reasoning_effort=d.get("reasoning_effort", ""),
+            reasoning_summary=d.get("reasoning_summary", ""),
+            parse_mode=d.get("parse_mode", PARSE_MODE_TEXT),
+            escalation_path=list(d.get("escalation_path", [])),
+        )
+
 
 def _parse_winner(text: str) -> str:
     """CoTレスポンスから勝者（AまたはB）をパースする。
@@ -73,6 +105,33 @@ def _parse_winner(text: str) -> str:
     return "INVALID"
 
 
+# 構造化出力モードの回答スキーマ
+_PAIRWISE_SCHEMA = json_schema_format(
+    "pairwise_comparison",
+    {"reasoning": {"type": "string"}, "winner": {"type": "string", "enum": ["A", "B"]}},
+)
+
+
+def _decode_winner(raw: str) -> tuple[str, str]:
+    """構造化出力の回答から (winner, parse_mode) を取り出す。
+
+    JSON としてデコードできなければテキスト出力と同じ規則でパースする。
+    """
+    data = parse_json_output(raw)
+    if data is None:
+        return _parse_winner(raw), PARSE_MODE_JSON_FALLBACK
+    winner = data.get("winner")
+    return (winner if winner in ("A", "B") else "INVALID"), PARSE_MODE_JSON
+
+
+def pairwise_parse_stats(results: list[dict]) -> dict[str, dict]:
+    """比較結果を parse_mode ごとに集計し、INVALID の割合を返す（推定エントリは除く）。"""
+    return summarize_parse_modes(
+        [r for r in results if not r.get("inferred")],
+        is_failure=lambda r: r["winner"] not in ("A", "B"),
+    )
+
+
 async def compare_pair(
     client: AsyncOpenAI,
     pm_a: dict,
@@ -80,24 +139,55 @@ async def compare_pair(
     criterion: Criterion,
     *,
     semaphore: asyncio.Semaphore | None = None,
+    structured: bool = False,
+    reasoning_effort: str | None = None,
+    model: str | None = None,
 ) -> PairwiseResult:
-    """2人の首相を指定基準でChain of Thoughtにより比較する。"""
+    """2人の首相を指定基準でChain of Thoughtにより比較する。
+
+    structured=True のときは JSON スキーマ {reasoning, winner} の構造化出力で回答させる。
+    reasoning_effort を指定すると DEFAULT_REASONING_EFFORT の代わりにその思考量で、
+    model を指定すると get_model() の代わりにそのモデルで呼び出す。
+    左右を入れ替えた基準（mirror_of あり）では API を呼ばず、元の基準のキャッシュの
+    winner を反転した結果を返す（mirrored_pair_entry）。
+    """
+    if criterion.mirror_of is not None:
+        return PairwiseResult.from_dict(
+            mirrored_pair_entry(criterion, pm_a["no"], pm_b["no"], model=model)
+        )
     prompt = (
         f"以下の2人の内閣総理大臣を「{criterion.left} ↔ {criterion.right}」の軸で比較してください。\n"
         f"{criterion.description}\n\n"
         f"【A】{pm_a['name']}\n"
         f"【B】{pm_b['name']}\n\n"
-        f"それぞれの人物についてこの軸に関する考察を簡潔に述べた上で、\n"
-        f"最後の行に「回答: A」または「回答: B」と、より「{criterion.right}」寄りの人物を回答してください。"
     )
+    if structured:
+        prompt += (
+            f"それぞれの人物についてこの軸に関する考察を reasoning に簡潔に述べた上で、\n"
+            f"winner に「A」または「B」と、より「{criterion.right}」寄りの人物を回答してください。"
+        )
+    else:
+        prompt += (
+            f"それぞれの人物についてこの軸に関する考察を簡潔に述べた上で、\n"
+            f"最後の行に「回答: A」または「回答: B」と、より「{criterion.right}」寄りの人物を回答してください。"
+        )
 
+    kwargs = {"text": _PAIRWISE_SCHEMA} if structured else {}
+    if reasoning_effort is not None:
+        kwargs["reasoning"] = {
+            "effort": reasoning_effort,
+            "summary": DEFAULT_REASONING_SUMMARY,
+        }
     async with maybe_acquire(semaphore):
         r, elapsed, effort = await call_with_retry(
-            client, model=get_model(), input=prompt
+            client, model=model or get_model(), input=prompt, **kwargs
         )
 
     raw = r.output_text or ""
-    winner = _parse_winner(raw)
+    if structured:
+        winner, parse_mode = _decode_winner(raw)
+    else:
+        winner, parse_mode = _parse_winner(raw), PARSE_MODE_TEXT
     return PairwiseResult(
         no_a=pm_a["no"],
         no_b=pm_b["no"],
@@ -111,4 +201,340 @@ async def compare_pair(
         created_at=str(r.created_at),
         reasoning_effort=effort,
         reasoning_summary=extract_reasoning_summary(r),
+        parse_mode=parse_mode,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 適応的な片方向比較 — 逆方向は必要な場合のみ問い合わせる
+# ---------------------------------------------------------------------------
+
+# 推論の迷いを示す表現。レスポンス中の出現数を不確実性スコアとする。
+_HEDGE_PATTERNS = (
+    "どちらとも",
+    "判断が難しい",
+    "判断は難しい",
+    "一概に",
+    "微妙",
+    "僅差",
+    "拮抗",
+    "甲乙",
+    "同程度",
+    "大差ない",
+)
+
+
+def uncertainty_score(text: str) -> int:
+    """CoTレスポンス中の迷いを示す表現の出現数を返す。"""
+    return sum(text.count(p) for p in _HEDGE_PATTERNS)
+
+
+def estimate_position_bias(
+    pair_results: dict, *, default: float = 0.5
+) -> dict[int, float]:
+    """両方向とも取得済みのペアから、人物ごとの提示順依存率を推定する。
+
+    ある人物が登場するペアのうち、llm(a,b) と llm(b,a) が同じ位置（AA / BB）を
+    勝者とした割合。両方向とも A / B の回答が得られたペアのみを数え、
+    そのようなペアが1件もない人物は default を返す。
+    """
+    counts: dict[int, int] = {}
+    inconsistent: dict[int, int] = {}
+    for a, inner in pair_results.items():
+        for b, entry in inner.items():
+            if a > b or entry.get("inferred"):
+                continue
+            reverse = pair_results.get(b, {}).get(a)
+            if reverse is None or reverse.get("inferred"):
+                continue
+            if not {entry["winner"], reverse["winner"]} <= {"A", "B"}:
+                continue
+            same_slot = entry["winner"] == reverse["winner"]
+            for no in (a, b):
+                counts[no] = counts.get(no, 0) + 1
+                inconsistent[no] = inconsistent.get(no, 0) + same_slot
+
+    all_nos = set(pair_results.keys())
+    for inner in pair_results.values():
+        all_nos.update(inner.keys())
+    return {
+        no: inconsistent[no] / counts[no] if no in counts else default for no in all_nos
+    }
+
+
+def pair_needs_escalation(
+    forward: PairwiseResult,
+    backward: PairwiseResult,
+    *,
+    prior: dict[int, float] | None = None,
+    boundary_band: float = 5.0,
+    uncertainty_threshold: int = 1,
+) -> bool:
+    """両方向の結果から、より強い設定（思考量・モデル）で比較し直すべきかを判定する。
+
+    - どちらかが INVALID
+    - 両方向で不一致（提示順に依存した回答）
+    - 事前スコア（ポイントワイズなど）の差が boundary_band 以内
+    - どちらかのレスポンスの不確実性スコアが uncertainty_threshold 以上
+    """
+    if forward.winner not in ("A", "B") or backward.winner not in ("A", "B"):
+        return True
+    if forward.winner == backward.winner:  # AA / BB は両方向で不一致
+        return True
+    if (
+        prior is not None
+        and forward.no_a in prior
+        and forward.no_b in prior
+        and abs(prior[forward.no_a] - prior[forward.no_b]) <= boundary_band
+    ):
+        return True
+    return (
+        max(
+            uncertainty_score(forward.raw_response),
+            uncertainty_score(backward.raw_response),
+        )
+        >= uncertainty_threshold
     )
+
+
+def _inferred_entry(no_a: int, no_b: int, winner: str, *, model: str = "") -> dict:
+    """API を呼ばずに推定した比較結果のエントリを作る（"inferred": True）。"""
+    return {
+        "no_a": no_a,
+        "no_b": no_b,
+        "winner": winner,
+        "raw_response": "",
+        "prompt": "",
+        "usage": Usage().to_dict(),
+        "elapsed_seconds": 0.0,
+        "response_id": "",
+        "model": model,
+        "created_at": "",
+        "reasoning_effort": "",
+        "reasoning_summary": "",
+        "inferred": True,
+    }
+
+
+def _inferred_reverse(entry: dict) -> dict:
+    """片方向の比較結果から、逆方向の結果を推定したエントリを作る。"""
+    winner = {"A": "B", "B": "A"}.get(entry["winner"], entry["winner"])
+    return _inferred_entry(
+        entry["no_b"], entry["no_a"], winner, model=entry.get("model", "")
+    )
+
+
+async def compare_pairs_adaptive(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    pair_results: dict | None = None,
+    pairs: list[tuple[int, int]] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    rng: random.Random | None = None,
+    bias_threshold: float = 0.25,
+    uncertainty_threshold: int = 1,
+    default_bias: float = 0.163,
+    batch_size: int = 100,
+    requery_inferred: bool = False,
+) -> tuple[dict, dict]:
+    """ランダムな片方向で比較し、確信度が低いペアだけ逆方向も問い合わせる。
+
+    逆方向を問い合わせる条件（いずれか）:
+    - 片方向の結果が INVALID
+    - 2人の提示順依存率（estimate_position_bias）の平均が bias_threshold 以上
+    - レスポンスの不確実性スコア（uncertainty_score）が uncertainty_threshold 以上
+
+    提示順依存率はバッチごとに、それまでに両方向が揃ったペアから再推定する。
+    両方向が揃ったペアがない人物（最初のバッチでは全員）には default_bias を使う。
+    既定値の 0.163 は 03a の左派↔右派で観測された不一致（TIE）の割合で、
+    bias_threshold より小さいため、最初のバッチから逆方向を省略できる。
+    default_bias を bias_threshold 以上にすると、最初のバッチでは省略しない。
+
+    pair_results に片方向だけ取得済みのペアは、欠けている方向のみを問い合わせる。
+    逆方向を省略したペアには winner を反転した推定エントリ（"inferred": True）を
+    入れるため、返り値は全ペア双方向比較と同じ pair_results 構造になる。
+    片方向が実際の比較結果で逆方向が推定エントリのペアは取得済みとして扱うため、
+    中断した実行を自身の返り値から再開しても推定済みの逆方向は問い合わせない。
+    requery_inferred=True のときだけ、推定エントリの方向も問い合わせ直す。
+
+    Returns:
+        (pair_results, stats) — stats は呼び出し回数と省略した逆方向の件数。
+    """
+    if pair_results is None:
+        pair_results = {}
+    if rng is None:
+        rng = random.Random()
+    pms_by_no = {p["no"]: p for p in pms}
+    if pairs is None:
+        pairs = list(combinations(sorted(pms_by_no), 2))
+
+    def has(x: int, y: int) -> bool:
+        entry = pair_results.get(x, {}).get(y)
+        return entry is not None and not entry.get("inferred")
+
+    def is_complete(a: int, b: int) -> bool:
+        forward = pair_results.get(a, {}).get(b)
+        backward = pair_results.get(b, {}).get(a)
+        if forward is None or backward is None:
+            return False
+        if requery_inferred:
+            return has(a, b) and has(b, a)
+        return has(a, b) or has(b, a)
+
+    remaining = [(a, b) for a, b in pairs if not is_complete(a, b)]
+    stats = {"pairs": len(remaining), "calls": 0, "reverse_calls": 0, "skipped": 0}
+
+    for batch_start in range(0, len(remaining), batch_size):
+        batch = remaining[batch_start : batch_start + batch_size]
+        bias = estimate_position_bias(pair_results, default=default_bias)
+
+        # 1回目: 片方向が取得済みなら欠けている方向、なければランダムな提示順で比較
+        ordered = []
+        for a, b in batch:
+            if has(a, b):
+                ordered.append((b, a))
+            elif has(b, a):
+                ordered.append((a, b))
+            else:
+                ordered.append((a, b) if rng.random() < 0.5 else (b, a))
+        first_results = await asyncio.gather(
+            *[
+                compare_pair(
+                    client, pms_by_no[a], pms_by_no[b], criterion, semaphore=semaphore
+                )
+                for a, b in ordered
+            ]
+        )
+        stats["calls"] += len(first_results)
+
+        # 2回目: 確信度が低いペアのみ逆方向で比較
+        to_reverse = []
+        for result in first_results:
+            a, b = result.no_a, result.no_b
+            pair_results.setdefault(a, {})[b] = result.to_dict()
+            if has(b, a):
+                continue
+            pair_bias = (bias.get(a, default_bias) + bias.get(b, default_bias)) / 2
+            if (
+                result.winner == "INVALID"
+                or pair_bias >= bias_threshold
+                or uncertainty_score(result.raw_response) >= uncertainty_threshold
+            ):
+                to_reverse.append(result)
+            else:
+                pair_results.setdefault(b, {})[a] = _inferred_reverse(
+                    pair_results[a][b]
+                )
+                stats["skipped"] += 1
+
+        reverse_results = await asyncio.gather(
+            *[
+                compare_pair(
+                    client,
+                    pms_by_no[r.no_b],
+                    pms_by_no[r.no_a],
+                    criterion,
+                    semaphore=semaphore,
+                )
+                for r in to_reverse
+            ]
+        )
+        for result in reverse_results:
+            pair_results.setdefault(result.no_a, {})[result.no_b] = result.to_dict()
+        stats["calls"] += len(reverse_results)
+        stats["reverse_calls"] += len(reverse_results)
+
+    return pair_results, stats
+
+
+# ---------------------------------------------------------------------------
+# ポイントワイズのスコアで絞り込んだ帯域内のみ比較
+# ---------------------------------------------------------------------------
+
+
+async def compare_pairs_banded(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    pointwise_results: list[dict],
+    *,
+    pair_results: dict | None = None,
+    rank_window: int | None = 8,
+    score_band: float | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> tuple[dict, dict]:
+    """ポイントワイズのスコアが近いペアだけを両方向で比較し、残りはスコアから推定する。
+
+    スコア順の順位差が rank_window 以内、またはスコア差が score_band 以内のペアを
+    「近いペア」として compare_pair で両方向とも比較する。同点のペアと、
+    スコアのない（パース失敗の）人物を含むペアも近いペアとして扱う。
+    それ以外のペアはスコアが高い方を右寄りとした推定エントリ（"inferred": True）を
+    両方向に入れるため、返り値は全ペア双方向比較と同じ pair_results 構造になる。
+    pair_results に取得済みの比較結果があれば再利用する。
+
+    Returns:
+        (pair_results, stats) — stats は {"pairs", "compared_pairs", "inferred_pairs",
+        "calls", "calls_saved"}。calls_saved はこの呼び出しで書き込んだ推定エントリの数で、
+        取得済みの比較結果を再利用した方向は含まない。
+    """
+    if pair_results is None:
+        pair_results = {}
+    pms_by_no = {p["no"]: p for p in pms}
+    scores = {
+        r["no"]: float(r["score"])
+        for r in pointwise_results
+        if 0 <= r["score"] <= 100 and r["no"] in pms_by_no
+    }
+    ranked = sorted(scores, key=lambda no: (scores[no], no))
+    rank = {no: i for i, no in enumerate(ranked)}
+
+    def is_near(a: int, b: int) -> bool:
+        if a not in scores or b not in scores or scores[a] == scores[b]:
+            return True
+        if rank_window is not None and abs(rank[a] - rank[b]) <= rank_window:
+            return True
+        return score_band is not None and abs(scores[a] - scores[b]) <= score_band
+
+    near, far = [], []
+    for a, b in combinations(sorted(pms_by_no), 2):
+        (near if is_near(a, b) else far).append((a, b))
+
+    to_call = [
+        (x, y)
+        for a, b in near
+        for x, y in ((a, b), (b, a))
+        if (entry := pair_results.get(x, {}).get(y)) is None or entry.get("inferred")
+    ]
+    results = await asyncio.gather(
+        *[
+            compare_pair(
+                client, pms_by_no[x], pms_by_no[y], criterion, semaphore=semaphore
+            )
+            for x, y in to_call
+        ]
+    )
+    for result in results:
+        pair_results.setdefault(result.no_a, {})[result.no_b] = result.to_dict()
+
+    model = results[0].model if results else ""
+    inferred = 0
+    for a, b in far:
+        winner = "A" if scores[a] > scores[b] else "B"
+        for x, y, w in ((a, b, winner), (b, a, "B" if winner == "A" else "A")):
+            entry = pair_results.get(x, {}).get(y)
+            if entry is None or entry.get("inferred"):
+                pair_results.setdefault(x, {})[y] = _inferred_entry(
+                    x, y, w, model=model
+                )
+                inferred += 1
+
+    stats = {
+        "pairs": len(near) + len(far),
+        "compared_pairs": len(near),
+        "inferred_pairs": len(far),
+        "calls": len(results),
+        "calls_saved": inferred,
+    }
+    return pair_results, stats
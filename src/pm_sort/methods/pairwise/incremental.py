@@ -0,0 +1,108 @@
+from collections.abc import Iterable
+
+import numpy as np
+from scipy.stats import kendalltau
+
+from .compare import PairwiseResult
+from .matrix import INVALID, MISSING, WIN_A, WIN_B
+from .tournament import competition_rank
+
+
+class IncrementalAnalysis:
+    """比較結果を1件ずつ受け取りながら勝利数・三すくみ数を更新する分析器。
+
+    インスタンス自体を kwiksort_live などの on_compare に渡せる。
+    1件の更新は O(n)（変化したペアを含む三すくみを数え直すだけ）で、
+    ranking() は途中経過でも win_count_sort と同じ形式・同じ規則
+    （両方向で一致した勝ちを1、TIE・未比較を0.5）の順位を返す。
+    """
+
+    def __init__(self, nos: Iterable[int]):
+        self.nos = np.array(sorted(nos), dtype=np.int64)
+        self._index = {int(no): i for i, no in enumerate(self.nos)}
+        n = len(self.nos)
+        # W: 片方向の勝敗行列、beats: 両方向で確定した「i が j に勝つ」
+        self._W = np.zeros((n, n), dtype=np.int8)
+        self._beats = np.zeros((n, n), dtype=bool)
+        self.wins = np.zeros(n, dtype=np.int64)
+        self.losses = np.zeros(n, dtype=np.int64)
+        self.num_results = 0
+        self.num_ties = 0  # 両方向とも取得済みで不一致・INVALID のペア数
+        self.num_violations = 0  # 有向3-サイクル（三すくみ）の数
+        self._stability: list[float] = []
+        self._last_points: np.ndarray | None = None
+
+    def __call__(self, result: PairwiseResult | dict) -> None:
+        self.update(result)
+
+    def _triangles_through(self, i: int, j: int) -> int:
+        """辺 i→j を含む有向3-サイクル（j→k→i）の数。"""
+        return int(np.count_nonzero(self._beats[j] & self._beats[:, i]))
+
+    def _pair_state(self, i: int, j: int) -> tuple[int, bool]:
+        """(i, j) の確定勝敗（1 / -1 / 0）と、両方向取得済みの TIE かどうか。"""
+        w_ij, w_ji = self._W[i, j], self._W[j, i]
+        if w_ij == WIN_A and w_ji == WIN_B:
+            return 1, False
+        if w_ij == WIN_B and w_ji == WIN_A:
+            return -1, False
+        return 0, w_ij != MISSING and w_ji != MISSING
+
+    def _set_edge(self, i: int, j: int, resolved: int, sign: int) -> None:
+        """確定勝敗 resolved の辺を追加（sign=1）または削除（sign=-1）する。"""
+        if resolved == 0:
+            return
+        winner, loser = (i, j) if resolved > 0 else (j, i)
+        if sign < 0:
+            self._beats[winner, loser] = False
+        self.num_violations += sign * self._triangles_through(winner, loser)
+        if sign > 0:
+            self._beats[winner, loser] = True
+        self.wins[winner] += sign
+        self.losses[loser] += sign
+
+    def update(self, result: PairwiseResult | dict) -> None:
+        """比較結果1件を取り込む。同じ提示順の結果が既にあれば上書きする。"""
+        if isinstance(result, PairwiseResult):
+            no_a, no_b, winner = result.no_a, result.no_b, result.winner
+        else:
+            no_a, no_b, winner = result["no_a"], result["no_b"], result["winner"]
+        i, j = self._index[no_a], self._index[no_b]
+
+        old_resolved, old_tie = self._pair_state(i, j)
+        self._W[i, j] = {"A": WIN_A, "B": WIN_B}.get(winner, INVALID)
+        new_resolved, new_tie = self._pair_state(i, j)
+
+        self.num_results += 1
+        self.num_ties += int(new_tie) - int(old_tie)
+        if new_resolved != old_resolved:
+            self._set_edge(i, j, old_resolved, -1)
+            self._set_edge(i, j, new_resolved, 1)
+
+    def points(self) -> np.ndarray:
+        """win_count_sort と同じ勝ち点（未確定のペアは双方に0.5）。"""
+        undecided = len(self.nos) - 1 - self.wins - self.losses
+        return self.wins + 0.5 * undecided
+
+    def ranking(self) -> list[tuple[int, int, float]]:
+        """現時点の [(no, rank, wins), ...] を勝ち点降順で返す（win_count_sort と同じ形式）。"""
+        points = self.points()
+        ranks = competition_rank(points)
+        order = np.lexsort((self.nos, -points))
+        return [
+            (int(self.nos[k]), int(ranks[k]), float(points[k])) for k in order.tolist()
+        ]
+
+    def check_stability(self, *, min_tau: float = 0.99, patience: int = 3) -> bool:
+        """前回呼び出し時からの勝ち点の Kendall τ を記録し、順位が安定したかを返す。
+
+        直近 patience 回の τ がすべて min_tau 以上なら True。
+        一定件数ごとに呼び出し、True になった時点でスイープを打ち切る使い方を想定する。
+        """
+        points = self.points()
+        if self._last_points is not None:
+            tau = kendalltau(self._last_points, points).statistic
+            self._stability.append(0.0 if np.isnan(tau) else float(tau))
+        self._last_points = points
+        recent = self._stability[-patience:]
+        return len(recent) == patience and min(recent) >= min_tau
@@ -0,0 +1,89 @@
+from collections.abc import Iterator
+
+import numpy as np
+
+# 勝敗行列の要素値。W[i, j] は pair_results[nos[i]][nos[j]]（i を A として提示）の結果。
+WIN_A = 1  # A（先出し）の勝ち
+WIN_B = -1  # B（後出し）の勝ち
+INVALID = 2  # パース失敗など A でも B でもない回答
+MISSING = 0  # キャッシュ欠落（対角成分を含む）
+
+
+def build_winner_matrix(
+    pair_results: dict, *, include_inferred: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """ネスト辞書の比較結果を片方向ごとの勝敗行列に変換する。
+
+    W[i, j] は「nos[i] を A、nos[j] を B として提示した比較」の winner を
+    WIN_A / WIN_B / INVALID / MISSING で表した int8 値。対角成分は MISSING。
+    include_inferred=False のときは逆方向から推定したエントリ（"inferred": True）を
+    MISSING として扱う。
+
+    Returns:
+        (nos, W) — nos は昇順の首相番号配列、W は (n, n) の int8 行列。
+    """
+    all_nos = set(pair_results.keys())
+    for inner in pair_results.values():
+        all_nos.update(inner.keys())
+    nos = np.array(sorted(all_nos), dtype=np.int64)
+    index = {int(no): i for i, no in enumerate(nos)}
+
+    W = np.zeros((len(nos), len(nos)), dtype=np.int8)
+    for a, inner in pair_results.items():
+        i = index[a]
+        for b, entry in inner.items():
+            if not include_inferred and entry.get("inferred"):
+                continue
+            winner = entry["winner"]
+            if winner == "A":
+                W[i, index[b]] = WIN_A
+            elif winner == "B":
+                W[i, index[b]] = WIN_B
+            else:
+                W[i, index[b]] = INVALID
+    return nos, W
+
+
+def resolve_winner_matrix(W: np.ndarray) -> np.ndarray:
+    """片方向の勝敗行列から両方向を照合した勝敗行列を導出する。
+
+    resolve_winner と同じ規則で、R[i, j] は
+    1 — i が勝ち（両方向で一致）、-1 — j が勝ち、0 — TIE（不一致・INVALID・欠落）。
+    R は反対称行列（R == -R.T）になる。
+    """
+    i_wins = (W == WIN_A) & (W.T == WIN_B)
+    j_wins = (W == WIN_B) & (W.T == WIN_A)
+    return i_wins.astype(np.int8) - j_wins.astype(np.int8)
+
+
+def beats_matrix(R: np.ndarray) -> np.ndarray:
+    """両方向照合済みの勝敗行列から「i が j に勝つ」を表すブール隣接行列を作る。"""
+    return R > 0
+
+
+def count_directed_triangles(beats: np.ndarray) -> int:
+    """有向3-サイクル（三すくみ）の数を数える。
+
+    trace(B³) / 3 を、(B @ B) と Bᵀ の要素積の総和として計算する。
+    行列積は BLAS を使うため float64 で行う（n ≲ 10⁵ まで整数値を正確に保持できる）。
+    """
+    B = beats.astype(np.float64)
+    return round(float(np.einsum("ij,ji->", B @ B, B))) // 3
+
+
+def iter_directed_triangles(beats: np.ndarray) -> Iterator[tuple[int, int, int]]:
+    """有向3-サイクル i→j→k→i を、i が最小のインデックスとなる形で1回ずつ列挙する。
+
+    i の昇順、同じ i の中では (j, k) の辞書順に生成する。
+    各 i について「i が勝つ j > i」と「i に勝つ k > i」の部分行列から
+    j→k の辺を取り出すため、Python レベルのループは n 回で済む。
+    """
+    n = len(beats)
+    for i in range(n - 2):
+        J = np.flatnonzero(beats[i, i + 1 :]) + i + 1
+        K = np.flatnonzero(beats[i + 1 :, i]) + i + 1
+        if len(J) == 0 or len(K) == 0:
+            continue
+        jj, kk = np.nonzero(beats[np.ix_(J, K)])
+        for j, k in zip(J[jj].tolist(), K[kk].tolist()):
+            yield i, j, k
@@ -0,0 +1,241 @@
+import asyncio
+import re
+from itertools import permutations
+
+from openai import AsyncOpenAI
+
+from ...core.api import (
+    PARSE_MODE_JSON,
+    PARSE_MODE_JSON_FALLBACK,
+    PARSE_MODE_TEXT,
+    call_with_retry,
+    extract_reasoning_summary,
+    extract_usage,
+    json_schema_format,
+    maybe_acquire,
+    parse_json_output,
+    split_usage,
+)
+from ...core.cache import load_results, nested_int_keys, save_results
+from ...core.config import get_model
+from ...core.criteria import Criterion
+from ..mirror import reject_mirror_query
+from .compare import PairwiseResult
+from .store import ComparisonStore
+
+# 複数軸の比較結果を保存する実験名（単一軸の pairwise とは別に保存する）
+MULTI_EXPERIMENT = "pairwise_multi"
+
+
+def _parse_multi_winners(text: str, criteria: list[Criterion]) -> dict[str, str]:
+    """「<軸名>: A」の行から軸ごとの勝者をパースする。同じ軸は後の行を優先する。
+
+    行頭の箇条書き記号（「- 」「・」「1. 」など）と、軸名や回答を囲む
+    Markdown の強調（「**left_right**: A」）、回答の後に続く補足
+    （「left_right: A（右派寄り）」）は許容する。
+    """
+    winners = {}
+    for c in criteria:
+        matches = re.findall(
+            rf"^[ \t]*(?:[-*・•]|\d+[.)．])?[ \t]*[*_`【\[]*{re.escape(c.name)}"
+            rf"[*_`】\]]*[ \t]*[：:][ \t]*[*_`]*([ABab])(?![A-Za-z0-9_])",
+            text,
+            re.MULTILINE,
+        )
+        winners[c.name] = matches[-1].upper() if matches else "INVALID"
+    return winners
+
+
+async def compare_pair_multi(
+    client: AsyncOpenAI,
+    pm_a: dict,
+    pm_b: dict,
+    criteria: list[Criterion],
+    *,
+    semaphore: asyncio.Semaphore | None = None,
+    structured: bool = False,
+) -> dict[str, PairwiseResult]:
+    """2人の首相を複数の軸について1回の呼び出しで比較する。
+
+    1つの回答を軸ごとの PairwiseResult に展開する。使用量と所要時間は軸の数で等分し、
+    raw_response・prompt・response_id は全軸で共有する。
+    structured=True のときは {reasoning, <軸名>: "A" | "B", ...} の構造化出力で回答させる。
+
+    Returns:
+        {criterion.name: PairwiseResult}
+    """
+    for c in criteria:
+        reject_mirror_query(c)
+    axes = "\n".join(
+        f"- {c.name}: 「{c.left} ↔ {c.right}」 {c.description}" for c in criteria
+    )
+    prompt = (
+        f"以下の2人の内閣総理大臣を、次の{len(criteria)}つの軸それぞれで比較してください。\n"
+        f"{axes}\n\n"
+        f"【A】{pm_a['name']}\n"
+        f"【B】{pm_b['name']}\n\n"
+    )
+    if structured:
+        prompt += (
+            "それぞれの人物について各軸に関する考察を reasoning に簡潔に述べた上で、\n"
+            "各軸の名前の項目に「A」または「B」と、その軸の右側の極により近い人物を回答してください。"
+        )
+    else:
+        prompt += (
+            "それぞれの人物について各軸に関する考察を簡潔に述べた上で、\n"
+            "最後に各軸について1行ずつ「軸の名前: A」または「軸の名前: B」の形式で、"
+            "その軸の右側の極により近い人物を回答してください。"
+        )
+
+    kwargs = {}
+    if structured:
+        properties = {"reasoning": {"type": "string"}}
+        properties.update(
+            {c.name: {"type": "string", "enum": ["A", "B"]} for c in criteria}
+        )
+        kwargs["text"] = json_schema_format("multi_criterion_comparison", properties)
+
+    async with maybe_acquire(semaphore):
+        r, elapsed, effort = await call_with_retry(
+            client, model=get_model(), input=prompt, **kwargs
+        )
+
+    raw = r.output_text or ""
+    winners: dict[str, str] | None = None
+    parse_mode = PARSE_MODE_TEXT
+    if structured:
+        data = parse_json_output(raw)
+        parse_mode = PARSE_MODE_JSON_FALLBACK if data is None else PARSE_MODE_JSON
+        if data is not None:
+            winners = {
+                c.name: data[c.name] if data.get(c.name) in ("A", "B") else "INVALID"
+                for c in criteria
+            }
+    if winners is None:
+        winners = _parse_multi_winners(raw, criteria)
+
+    usages = split_usage(extract_usage(r), len(criteria))
+    reasoning_summary = extract_reasoning_summary(r)
+    return {
+        c.name: PairwiseResult(
+            no_a=pm_a["no"],
+            no_b=pm_b["no"],
+            winner=winners[c.name],
+            raw_response=raw,
+            prompt=prompt,
+            usage=usage,
+            elapsed_seconds=elapsed / len(criteria),
+            response_id=r.id,
+            model=r.model,
+            created_at=str(r.created_at),
+            reasoning_effort=effort,
+            reasoning_summary=reasoning_summary,
+            parse_mode=parse_mode,
+        )
+        for c, usage in zip(criteria, usages)
+    }
+
+
+async def compare_pairs_multi(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criteria: list[Criterion],
+    *,
+    pairs: list[tuple[int, int]] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    structured: bool = False,
+    save: bool = True,
+    batch_size: int = 100,
+) -> dict[str, dict]:
+    """全ペア（両方向）を複数軸まとめて比較し、軸ごとの pair_results に振り分ける。
+
+    pairs は提示順付きの (no_a, no_b) のリスト（省略時は全ペアの両方向）。
+    batch_size 件ずつ並列に問い合わせ、save=True のときはバッチごとに
+    pairwise_multi/<criterion>.json に軸ごとに保存する（中断しても途中から再開できる）。
+    既に保存済みの比較は問い合わせない。
+
+    Returns:
+        {criterion.name: pair_results}
+    """
+    pms_by_no = {p["no"]: p for p in pms}
+    if pairs is None:
+        pairs = list(permutations(sorted(pms_by_no), 2))
+
+    by_criterion: dict[str, dict] = {}
+    for c in criteria:
+        cached = load_results(MULTI_EXPERIMENT, c.name) if save else None
+        by_criterion[c.name] = nested_int_keys(cached) if cached else {}
+
+    remaining = [
+        (a, b)
+        for a, b in pairs
+        if any(b not in by_criterion[c.name].get(a, {}) for c in criteria)
+    ]
+    for batch_start in range(0, len(remaining), batch_size):
+        batch = remaining[batch_start : batch_start + batch_size]
+        fanned = await asyncio.gather(
+            *[
+                compare_pair_multi(
+                    client,
+                    pms_by_no[a],
+                    pms_by_no[b],
+                    criteria,
+                    semaphore=semaphore,
+                    structured=structured,
+                )
+                for a, b in batch
+            ]
+        )
+        for results in fanned:
+            for name, result in results.items():
+                by_criterion[name].setdefault(result.no_a, {})[result.no_b] = (
+                    result.to_dict()
+                )
+
+        if save:
+            for name, pair_results in by_criterion.items():
+                save_results(MULTI_EXPERIMENT, name, pair_results)
+    return by_criterion
+
+
+def evaluate_multi_criterion(
+    multi_by_criterion: dict[str, dict],
+    *,
+    reference_by_criterion: dict[str, dict] | None = None,
+) -> list[dict]:
+    """複数軸まとめての比較結果を、単一軸の比較結果と提示順ごとに突き合わせる。
+
+    reference_by_criterion を省略すると、ComparisonStore.from_cache で読み込んだ
+    単一軸のキャッシュ（全ペア比較と KwikSort の比較ログ）を参照とする。
+    両方で A / B の回答が得られた比較のみを対象に一致率を計算する。
+
+    Returns:
+        [{"criterion", "compared", "agreement", "multi_invalid_rate"}, ...]
+    """
+    rows = []
+    for name, multi in multi_by_criterion.items():
+        if reference_by_criterion is not None:
+            reference = reference_by_criterion.get(name, {})
+        else:
+            reference = ComparisonStore.from_cache(name).pair_results
+
+        entries = [e for inner in multi.values() for e in inner.values()]
+        invalid = sum(e["winner"] not in ("A", "B") for e in entries)
+        compared = agree = 0
+        for e in entries:
+            ref = reference.get(e["no_a"], {}).get(e["no_b"])
+            if ref is None or ref.get("inferred"):
+                continue
+            if e["winner"] not in ("A", "B") or ref["winner"] not in ("A", "B"):
+                continue
+            compared += 1
+            agree += e["winner"] == ref["winner"]
+        rows.append(
+            {
+                "criterion": name,
+                "compared": compared,
+                "agreement": agree / compared if compared else None,
+                "multi_invalid_rate": invalid / len(entries) if entries else None,
+            }
+        )
+    return rows
@@ -0,0 +1,64 @@
+import random
+import re
+
+# ピボット選択戦略
+PIVOT_STRATEGIES = ("random", "median_of_sample", "prior_median")
+
+
+def prior_from_pointwise(results: list[dict]) -> dict[int, float]:
+    """ポイントワイズ評価の結果から事前順位（小さいほど左寄り）を作る。
+
+    パース失敗（score = -1）の人物は含めない。
+    """
+    return {r["no"]: float(r["score"]) for r in results if 0 <= r["score"] <= 100}
+
+
+def prior_from_listwise(result: dict) -> dict[int, float]:
+    """リストワイズ評価の結果から事前順位（出力順の位置、小さいほど左寄り）を作る。
+
+    重複した番号は最初の出現位置を採用する。
+    """
+    prior: dict[int, float] = {}
+    for no in (int(x) for x in re.findall(r"\d+", result["raw_response"])):
+        prior.setdefault(no, float(len(prior)))
+    return prior
+
+
+def _prior_median(items: list[dict], prior: dict[int, float]) -> dict | None:
+    ranked = sorted(
+        (item for item in items if item["no"] in prior),
+        key=lambda item: (prior[item["no"]], item["no"]),
+    )
+    if not ranked:
+        return None
+    return ranked[(len(ranked) - 1) // 2]
+
+
+def select_pivot(
+    items: list[dict],
+    rng: random.Random,
+    *,
+    strategy: str = "random",
+    prior: dict[int, float] | None = None,
+    sample_size: int = 3,
+) -> dict:
+    """KwikSort のピボットを選ぶ。
+
+    strategy:
+        "random" — 一様ランダム（rng.choice。従来の KwikSort と同じ乱数列）
+        "median_of_sample" — sample_size 人をランダムに選び、事前順位の中央値の人物
+        "prior_median" — 区間全体で事前順位の中央値の人物
+
+    事前順位を持つ人物が区間内にいなければ一様ランダムにフォールバックする。
+    """
+    if strategy == "random" or prior is None:
+        if strategy not in PIVOT_STRATEGIES:
+            raise ValueError(f"未知のピボット選択戦略です: {strategy!r}")
+        return rng.choice(items)
+    if strategy == "median_of_sample":
+        candidates = rng.sample(items, min(sample_size, len(items)))
+    elif strategy == "prior_median":
+        candidates = items
+    else:
+        raise ValueError(f"未知のピボット選択戦略です: {strategy!r}")
+    return _prior_median(candidates, prior) or rng.choice(items)
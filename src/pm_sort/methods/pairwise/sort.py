@@ -4,11 +4,16 @@ import asyncio
 import logging
 import random
 from collections.abc import Callable
+from functools import partial
 
+import numpy as np
 from openai import AsyncOpenAI
 
 from ...core.criteria import Criterion
 from .compare import PairwiseResult, compare_pair
+from .matrix import WIN_A, WIN_B, build_winner_matrix
+from .pivot import PIVOT_STRATEGIES, select_pivot
+from .store import ComparisonStore
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +24,15 @@ def kwiksort_cached(
     *,
     comparison_log: list | None = None,
     rng: random.Random | None = None,
+    pivot_strategy: str = "random",
+    prior: dict[int, float] | None = None,
+    stats: dict | None = None,
 ) -> list[dict]:
     """事前計算済みの全ペア比較結果を使ったKwikSort（API呼び出しなし）。
 
     pair_results はネスト辞書 {no_a: {no_b: {"winner": ..., ...}, ...}, ...}。
+    pivot_strategy と prior はピボット選択方法（select_pivot を参照）。
+    stats を渡すと再帰の最大深さを stats["max_depth"] に記録する。
     """
     if len(items) <= 1:
         return items
@@ -31,7 +41,14 @@ def kwiksort_cached(
         rng = random.Random()
 
     return _kwiksort_cached_inner(
-        items, pair_results, comparison_log=comparison_log, rng=rng
+        items,
+        pair_results,
+        comparison_log=comparison_log,
+        choose_pivot=partial(
+            select_pivot, rng=rng, strategy=pivot_strategy, prior=prior
+        ),
+        stats=stats,
+        depth=1,
     )
 
 
@@ -40,12 +57,17 @@ def _kwiksort_cached_inner(
     pair_results: dict,
     *,
     comparison_log: list | None = None,
-    rng: random.Random,
+    choose_pivot: Callable[[list[dict]], dict],
+    stats: dict | None,
+    depth: int,
 ) -> list[dict]:
     if len(items) <= 1:
         return items
 
-    pivot = rng.choice(items)
+    if stats is not None:
+        stats["max_depth"] = max(stats.get("max_depth", 0), depth)
+
+    pivot = choose_pivot(items)
     left, equal, right = [], [pivot], []
 
     pivot_no = pivot["no"]
@@ -82,15 +104,138 @@ def _kwiksort_cached_inner(
         if comparison_log is not None:
             comparison_log.append({"no_a": pivot_no, "no_b": item_no})
 
-    sorted_left = _kwiksort_cached_inner(
-        left, pair_results, comparison_log=comparison_log, rng=rng
-    )
-    sorted_right = _kwiksort_cached_inner(
-        right, pair_results, comparison_log=comparison_log, rng=rng
-    )
+    kwargs = {
+        "comparison_log": comparison_log,
+        "choose_pivot": choose_pivot,
+        "stats": stats,
+        "depth": depth + 1,
+    }
+    sorted_left = _kwiksort_cached_inner(left, pair_results, **kwargs)
+    sorted_right = _kwiksort_cached_inner(right, pair_results, **kwargs)
     return sorted_left + equal + sorted_right
 
 
+def evaluate_pivot_strategies(
+    items: list[dict],
+    pair_results: dict,
+    priors: dict[str, dict[int, float]],
+    *,
+    strategies: tuple[str, ...] = PIVOT_STRATEGIES,
+    n_seeds: int = 100,
+) -> list[dict]:
+    """ピボット選択戦略ごとに KwikSort を seed 0〜n_seeds-1 で実行し、比較回数と再帰深さを集計する。
+
+    priors は {事前順位の名前: prior} の辞書（例: {"pointwise": ..., "listwise": ...}）。
+    "random" は事前順位を使わないため1行だけ出力する。
+
+    Returns:
+        [{"strategy", "prior", "mean_comparisons", "mean_depth", "max_depth"}, ...]
+    """
+    rows = []
+    for strategy in strategies:
+        prior_items = [("-", None)] if strategy == "random" else list(priors.items())
+        for prior_name, prior in prior_items:
+            comparisons, depths = [], []
+            for seed in range(n_seeds):
+                log: list = []
+                stats: dict = {}
+                kwiksort_cached(
+                    list(items),
+                    pair_results,
+                    comparison_log=log,
+                    rng=random.Random(seed),
+                    pivot_strategy=strategy,
+                    prior=prior,
+                    stats=stats,
+                )
+                comparisons.append(len(log))
+                depths.append(stats.get("max_depth", 0))
+            rows.append(
+                {
+                    "strategy": strategy,
+                    "prior": prior_name,
+                    "mean_comparisons": sum(comparisons) / n_seeds,
+                    "mean_depth": sum(depths) / n_seeds,
+                    "max_depth": max(depths),
+                }
+            )
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Batched KwikSort — 複数 seed を NumPy でまとめて実行
+# ---------------------------------------------------------------------------
+
+
+def kwiksort_batch(
+    pair_results: dict,
+    n_seeds: int,
+    *,
+    seed: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """事前計算済みの全ペア比較結果を使い、KwikSort を n_seeds 回まとめて実行する。
+
+    kwiksort_cached と同じ分割規則（pivot を A とした比較で "A" なら左、"B" なら右、
+    INVALID・欠落なら pivot と同等）を、全 seed・全区間について1ラウンドずつ
+    ベクトル化して適用する。ピボットは各区間から一様ランダムに選ぶため
+    分布は kwiksort_cached と同じだが、random.Random(seed) の結果とは一致しない。
+
+    Returns:
+        (rankings, num_comparisons) — rankings は (n_seeds, n) の首相番号配列
+        （各行が左寄り→右寄りのランキング）、num_comparisons は各実行の比較参照回数。
+    """
+    nos, W = build_winner_matrix(pair_results)
+    n = len(nos)
+    rng = np.random.default_rng(seed)
+    cols = np.arange(n)
+    row_offset = np.arange(n_seeds)[:, None] * n
+
+    # seg[s, i]: 実行 s で要素 i が属する区間ID。行内で区間の並び順を保つ連番。
+    seg = np.zeros((n_seeds, n), dtype=np.int64)
+    done = np.zeros((n_seeds, n), dtype=bool)
+    num_comparisons = np.zeros(n_seeds, dtype=np.int64)
+
+    while True:
+        sizes = np.bincount((seg + row_offset).ravel(), minlength=n_seeds * n)
+        seg_size = sizes[seg + row_offset]
+        done |= seg_size == 1
+        active = ~done
+        if not active.any():
+            break
+
+        # 各区間で乱数値が最大の要素をピボットにする（区間内で一様ランダム）
+        flat_seg = (seg + row_offset).ravel()
+        priority = np.where(active, rng.random((n_seeds, n)), -1.0).ravel()
+        seg_max = np.full(n_seeds * n, -1.0)
+        np.maximum.at(seg_max, flat_seg, priority)
+        is_max = active.ravel() & (priority == seg_max[flat_seg])
+        pivot_of_seg = np.zeros(n_seeds * n, dtype=np.int64)
+        pivot_of_seg[flat_seg[is_max]] = np.tile(cols, n_seeds)[is_max]
+        pivot = pivot_of_seg[flat_seg].reshape(n_seeds, n)
+
+        # pivot を A（先出し）とした比較結果で 左:0 / pivot:1 / 同等:2 / 右:3 に振り分け
+        w = W[pivot, cols]
+        side = np.where(w == WIN_A, 0, np.where(w == WIN_B, 3, 2))
+        is_pivot = pivot == cols
+        side[is_pivot] = 1
+
+        compared = active & ~is_pivot
+        num_comparisons += compared.sum(axis=1)
+        done |= active & (side != 0) & (side != 3)
+
+        # 区間IDを (旧区間, side) の順で振り直す（行ごとに 0 からの連番）
+        new_key = seg * 4 + np.where(active, side, 1)
+        flat_key = (new_key + row_offset * 4).ravel()
+        present = np.zeros(n_seeds * n * 4, dtype=np.int64)
+        present[flat_key] = 1
+        dense = np.cumsum(present.reshape(n_seeds, n * 4), axis=1) - 1
+        seg = np.take_along_axis(dense, new_key, axis=1)
+
+    # 区間ID順、同じ区間（同等グループ）内は入力順に並べる
+    final_order = np.argsort(seg * n + cols, axis=1)
+    return nos[final_order], num_comparisons
+
+
 # ---------------------------------------------------------------------------
 # Live KwikSort — API を呼びながらソート
 # ---------------------------------------------------------------------------
@@ -104,9 +249,18 @@ async def kwiksort_live(
     semaphore: asyncio.Semaphore | None = None,
     rng: random.Random | None = None,
     on_compare: Callable[[PairwiseResult], None] | None = None,
+    store: ComparisonStore | None = None,
+    pivot_strategy: str = "random",
+    prior: dict[int, float] | None = None,
 ) -> tuple[list[dict], list[PairwiseResult]]:
     """API を呼びながら KwikSort を実行する。
 
+    store を渡すと、同じ (pivot, item) の比較結果がストアにあれば API を呼ばずに再利用し、
+    新しく取得した結果をストアに書き戻す（ソート終了時に未保存の結果も保存する）。
+    左右を入れ替えた基準（mirror_of あり）では、store を省略しても
+    ComparisonStore.from_cache で元の基準から導出したストアを使い、API は呼ばない。
+    pivot_strategy と prior はピボット選択方法（select_pivot を参照）。
+
     Returns:
         (sorted_items, all_comparison_results)
     """
@@ -115,6 +269,8 @@ async def kwiksort_live(
 
     if rng is None:
         rng = random.Random()
+    if store is None and criterion.mirror_of is not None:
+        store = ComparisonStore.from_cache(criterion.name)
 
     results: list[PairwiseResult] = []
     sorted_items = await _kwiksort_live_inner(
@@ -122,10 +278,15 @@ async def kwiksort_live(
         criterion=criterion,
         client=client,
         semaphore=semaphore,
-        rng=rng,
+        choose_pivot=partial(
+            select_pivot, rng=rng, strategy=pivot_strategy, prior=prior
+        ),
         results=results,
         on_compare=on_compare,
+        store=store,
     )
+    if store is not None:
+        store.save()
     return sorted_items, results
 
 
@@ -135,25 +296,34 @@ async def _kwiksort_live_inner(
     criterion: Criterion,
     client: AsyncOpenAI,
     semaphore: asyncio.Semaphore | None,
-    rng: random.Random,
+    choose_pivot: Callable[[list[dict]], dict],
     results: list[PairwiseResult],
     on_compare: Callable[[PairwiseResult], None] | None,
+    store: ComparisonStore | None,
 ) -> list[dict]:
     if len(items) <= 1:
         return items
 
-    pivot = rng.choice(items)
+    pivot = choose_pivot(items)
     left, equal, right = [], [pivot], []
 
     pivot_no = pivot["no"]
     others = [item for item in items if item["no"] != pivot_no]
 
     # ピボットと各要素の比較を並列実行
-    coros = [
-        compare_pair(client, pivot, item, criterion, semaphore=semaphore)
-        for item in others
-    ]
-    pair_results = await asyncio.gather(*coros)
+    if store is not None:
+        pair_results = await store.compare_many(
+            client,
+            [(pivot, item) for item in others],
+            criterion,
+            semaphore=semaphore,
+        )
+    else:
+        coros = [
+            compare_pair(client, pivot, item, criterion, semaphore=semaphore)
+            for item in others
+        ]
+        pair_results = await asyncio.gather(*coros)
 
     for item, result in zip(others, pair_results):
         results.append(result)
@@ -171,9 +341,10 @@ async def _kwiksort_live_inner(
         criterion=criterion,
         client=client,
         semaphore=semaphore,
-        rng=rng,
+        choose_pivot=choose_pivot,
         results=results,
         on_compare=on_compare,
+        store=store,
     )
     sorted_left = await _kwiksort_live_inner(left, **kwargs)
     sorted_right = await _kwiksort_live_inner(right, **kwargs)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+
+from openai import AsyncOpenAI
+
+from ...core.cache import list_results, load_results, nested_int_keys, save_results
+from ...core.criteria import MIRROR_CRITERIA, Criterion
+from ..mirror import mirror_pair_results
+from .compare import PairwiseResult, compare_pair
+
+# ストアが新しく取得した比較結果を保存する実験名。
+# pairwise/<criterion>.json は全ペア比較の完全なキャッシュとして読まれるため、
+# KwikSort などで部分的に取得した結果はこちらに分けて保存する。
+STORE_EXPERIMENT = "pairwise/store"
+
+
+class ComparisonStore:
+    """ペアワイズ比較結果の再利用層。
+
+    pair_results と同じネスト辞書 {no_a: {no_b: result_dict}} を保持し、
+    同じ提示順 (no_a, no_b) の比較が既にあれば API を呼ばずに返す。
+    criterion_name を指定すると、新しく取得した結果を pairwise/store/<criterion>.json に
+    save_every 件ごとに書き戻す（残りは save() で書き出す）。
+    """
+
+    def __init__(
+        self,
+        pair_results: dict | None = None,
+        *,
+        criterion_name: str | None = None,
+        save_every: int = 100,
+    ):
+        self.pair_results = pair_results if pair_results is not None else {}
+        self.criterion_name = criterion_name
+        # 左右を入れ替えた基準では、保持する結果はすべて元の基準から導出したもの
+        self.mirror_of = (
+            MIRROR_CRITERIA[criterion_name].mirror_of
+            if criterion_name in MIRROR_CRITERIA
+            else None
+        )
+        self.save_every = save_every
+        self.stored: dict = {}  # pairwise/store/<criterion>.json に保存する結果
+        self.unsaved = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_cache(
+        cls,
+        criterion_name: str,
+        *,
+        include_kwiksort: bool = True,
+        save_every: int = 100,
+    ) -> ComparisonStore:
+        """キャッシュ済みの全ペア比較・ストアの保存結果・KwikSort 各 seed の比較結果から構築する。
+
+        全ペア比較（pairwise/<criterion>.json）の結果を優先し、次にストアが保存した結果
+        （pairwise/store/<criterion>.json）、最後に KwikSort の比較ログのうち
+        winner を含むもの（kwiksort_live の結果）を取り込む。
+        左右を入れ替えた基準（mirror_of あり）では、元の基準のストアの winner を
+        反転したものだけを持つ読み取り専用のストアを返す（その基準自身の名前の
+        キャッシュは読まず、API も呼ばず、save() でも書き出さない）。
+        """
+        if criterion_name in MIRROR_CRITERIA:
+            mirror_of = MIRROR_CRITERIA[criterion_name].mirror_of
+            base = cls.from_cache(mirror_of, include_kwiksort=include_kwiksort)
+            return cls(
+                mirror_pair_results(base.pair_results, mirror_of),
+                criterion_name=criterion_name,
+            )
+
+        store = cls(criterion_name=criterion_name, save_every=save_every)
+        store._load_own(criterion_name)
+        if include_kwiksort:
+            experiment = f"pairwise/kwiksort/{criterion_name}"
+            for name in list_results(experiment):
+                run = load_results(experiment, name)
+                for entry in (run or {}).get("comparisons", []):
+                    if "winner" not in entry:
+                        continue
+                    inner = store.pair_results.setdefault(entry["no_a"], {})
+                    inner.setdefault(entry["no_b"], entry)
+        return store
+
+    def _load_own(self, criterion_name: str) -> None:
+        """全ペア比較とストアの保存結果（全ペア比較を優先）を取り込む。"""
+        all_pairs = load_results("pairwise", criterion_name)
+        stored = load_results(STORE_EXPERIMENT, criterion_name)
+        self.stored = nested_int_keys(stored) if stored else {}
+        own = nested_int_keys(all_pairs) if all_pairs else {}
+        for a, inner in self.stored.items():
+            for b, entry in inner.items():
+                own.setdefault(a, {}).setdefault(b, entry)
+        for a, inner in own.items():
+            target = self.pair_results.setdefault(a, {})
+            for b, entry in inner.items():
+                target.setdefault(b, entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.pair_results.values())
+
+    def get(self, no_a: int, no_b: int) -> dict | None:
+        """(no_a, no_b) の順で提示した比較結果を返す。推定エントリは対象外。"""
+        entry = self.pair_results.get(no_a, {}).get(no_b)
+        if entry is None or entry.get("inferred"):
+            return None
+        return entry
+
+    def put(self, result: PairwiseResult) -> None:
+        entry = result.to_dict()
+        self.pair_results.setdefault(result.no_a, {})[result.no_b] = entry
+        self.stored.setdefault(result.no_a, {})[result.no_b] = entry
+        self.unsaved += 1
+
+    def save(self) -> None:
+        """未保存の結果があり criterion_name が指定されていれば、ストアの保存先に書き戻す。
+
+        左右を入れ替えた基準のストアは導出した結果しか持たないため書き出さない。
+        """
+        if self.criterion_name is not None and self.mirror_of is None and self.unsaved:
+            save_results(STORE_EXPERIMENT, self.criterion_name, self.stored)
+        self.unsaved = 0
+
+    async def compare_many(
+        self,
+        client: AsyncOpenAI,
+        pairs: list[tuple[dict, dict]],
+        criterion: Criterion,
+        *,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> list[PairwiseResult]:
+        """(pm_a, pm_b) のリストを比較する。ヒットは即座に返し、ミスのみ並列に API を呼ぶ。
+
+        左右を入れ替えた基準のストアでミスがあれば、API を呼ばずに ValueError を送出する。
+        """
+        if self.criterion_name is not None and self.criterion_name != criterion.name:
+            raise ValueError(
+                f"ストアの評価基準 {self.criterion_name!r} と "
+                f"比較の評価基準 {criterion.name!r} が一致しません"
+            )
+
+        results: list[PairwiseResult | None] = [None] * len(pairs)
+        miss_indices = []
+        for i, (pm_a, pm_b) in enumerate(pairs):
+            entry = self.get(pm_a["no"], pm_b["no"])
+            if entry is None:
+                miss_indices.append(i)
+            else:
+                results[i] = PairwiseResult.from_dict(entry)
+        self.hits += len(pairs) - len(miss_indices)
+        self.misses += len(miss_indices)
+        if self.mirror_of is not None and miss_indices:
+            raise ValueError(
+                f"元の基準 {self.mirror_of!r} に未取得の比較が {len(miss_indices)} 件あります。"
+                "左右を入れ替えた基準では API を呼ばないため、元の基準で比較してください"
+            )
+
+        fresh = await asyncio.gather(
+            *[
+                compare_pair(
+                    client, pairs[i][0], pairs[i][1], criterion, semaphore=semaphore
+                )
+                for i in miss_indices
+            ]
+        )
+        for i, result in zip(miss_indices, fresh):
+            results[i] = result
+            self.put(result)
+        if self.unsaved >= self.save_every:
+            self.save()
+        return results
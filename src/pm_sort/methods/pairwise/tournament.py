@@ -0,0 +1,77 @@
+import numpy as np
+
+from .matrix import MISSING, WIN_A, WIN_B, build_winner_matrix, resolve_winner_matrix
+
+# tournament_scores が返すスコアの種類
+TOURNAMENT_METHODS = ("win_count", "copeland", "borda", "win_rate")
+
+
+def competition_rank(scores: np.ndarray) -> np.ndarray:
+    """スコア降順の標準競技順位（1, 2, 2, 4, ...）を返す。
+
+    各要素の順位は「自分より大きいスコアを持つ要素の数 + 1」。
+    """
+    ascending = np.sort(scores)
+    return len(scores) - np.searchsorted(ascending, scores, side="right") + 1
+
+
+def tournament_scores_from_matrix(
+    nos: np.ndarray, W: np.ndarray
+) -> dict[str, np.ndarray]:
+    """片方向の勝敗行列から各種トーナメントスコアをまとめて計算する。
+
+    - win_count: 両方向で一致した勝ちを1、TIE（不一致・INVALID・欠落）を0.5とした勝ち点
+      （win_count_sort と同じ）
+    - copeland: 勝ち数 − 負け数（TIE は0）
+    - borda: 片方向ごとの比較を1票として数えた得票数（最大 2 × (n − 1)）
+    - win_rate: 両方向とも取得済みのペアに対する勝率（TIE は0.5勝）
+
+    Returns:
+        {スコア名: nos と同じ並びのスコア配列}
+    """
+    n = len(nos)
+    R = resolve_winner_matrix(W)
+    wins = (R > 0).sum(axis=1)
+    losses = (R < 0).sum(axis=1)
+
+    present = W != MISSING
+    paired = present & present.T
+    paired_count = paired.sum(axis=1)
+    paired_ties = (paired & (R == 0)).sum(axis=1)
+
+    votes = (W == WIN_A).sum(axis=1) + (W == WIN_B).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(
+            paired_count > 0, (wins + 0.5 * paired_ties) / paired_count, np.nan
+        )
+
+    return {
+        "win_count": wins + 0.5 * (n - 1 - wins - losses),
+        "copeland": (wins - losses).astype(np.float64),
+        "borda": votes.astype(np.float64),
+        "win_rate": win_rate,
+    }
+
+
+def tournament_scores(
+    pair_results: dict,
+) -> dict[str, list[tuple[int, int, float]]]:
+    """全ペア比較データから勝利数・Copeland・Borda・勝率のランキングをまとめて作る。
+
+    各ランキングは win_count_sort と同じ形式で、スコア降順・同点は番号昇順に並べ、
+    同じスコアには同じ順位を付与する（標準競技順位方式: 1, 2, 2, 4, ...）。
+
+    Returns:
+        {スコア名: [(no, rank, score), ...]}
+    """
+    nos, W = build_winner_matrix(pair_results)
+    rankings = {}
+    for method, scores in tournament_scores_from_matrix(nos, W).items():
+        scores = np.nan_to_num(scores, nan=-np.inf)
+        ranks = competition_rank(scores)
+        order = np.lexsort((nos, -scores))
+        rankings[method] = [
+            (int(nos[i]), int(ranks[i]), float(scores[i])) for i in order
+        ]
+    return rankings
@@ -2,17 +2,27 @@ import asyncio
 import re
 from dataclasses import dataclass, field
 
+import numpy as np
 from openai import AsyncOpenAI
+from scipy.stats import t as student_t
 
 from ..core.api import (
+    PARSE_MODE_JSON,
+    PARSE_MODE_JSON_FALLBACK,
+    PARSE_MODE_TEXT,
     Usage,
     call_with_retry,
     extract_reasoning_summary,
     extract_usage,
+    json_schema_format,
     maybe_acquire,
+    parse_json_output,
+    split_usage,
+    summarize_parse_modes,
 )
 from ..core.config import get_model
 from ..core.criteria import Criterion
+from .mirror import mirrored_pointwise_entry, reject_mirror_query
 
 
 @dataclass
@@ -29,6 +39,76 @@ class PointwiseResult:
     created_at: str = ""
     reasoning_effort: str = ""
     reasoning_summary: str = ""
+    parse_mode: str = PARSE_MODE_TEXT
+
+    def to_dict(self) -> dict:
+        return {
+            "no": self.no,
+            "score": self.score,
+            "raw_response": self.raw_response,
+            "usage": self.usage.to_dict(),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "response_id": self.response_id,
+            "model": self.model,
+            "created_at": self.created_at,
+            "reasoning_effort": self.reasoning_effort,
+            "reasoning_summary": self.reasoning_summary,
+            "parse_mode": self.parse_mode,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PointwiseResult":
+        return cls(
+            no=d["no"],
+            score=d["score"],
+            raw_response=d.get("raw_response", ""),
+            usage=Usage.from_dict(d.get("usage") or {}),
+            elapsed_seconds=d.get("elapsed_seconds", 0.0),
+            response_id=d.get("response_id", ""),
+            model=d.get("model", ""),
+            created_at=d.get("created_at", ""),
+            reasoning_effort=d.get("reasoning_effort", ""),
+            reasoning_summary=d.get("reasoning_summary", ""),
+            parse_mode=d.get("parse_mode", PARSE_MODE_TEXT),
+        )
+
+
+# 構造化出力モードの回答スキーマ
+_POINTWISE_SCHEMA = json_schema_format(
+    "pointwise_score",
+    {"reasoning": {"type": "string"}, "score": {"type": "integer"}},
+)
+
+
+def _parse_score(raw: str) -> int:
+    """テキスト回答から「スコア: X」（なければ最終行の数字）をパースする。失敗時は -1。"""
+    match = re.search(r"スコア[：:]\s*(\d+)", raw)
+    if match:
+        return int(match.group(1))
+    try:
+        return int(raw.splitlines()[-1].strip())
+    except (ValueError, IndexError):
+        return -1
+
+
+def _decode_score(raw: str) -> tuple[int, str]:
+    """構造化出力の回答から (score, parse_mode) を取り出す。
+
+    JSON としてデコードできなければテキスト出力と同じ規則でパースする。
+    0〜100 の範囲外のスコアはパース失敗（-1）とする。
+    """
+    data = parse_json_output(raw)
+    if data is None:
+        return _parse_score(raw), PARSE_MODE_JSON_FALLBACK
+    score = data.get("score")
+    if isinstance(score, int) and 0 <= score <= 100:
+        return score, PARSE_MODE_JSON
+    return -1, PARSE_MODE_JSON
+
+
+def pointwise_parse_stats(results: list[dict]) -> dict[str, dict]:
+    """評価結果を parse_mode ごとに集計し、パース失敗（score = -1）の割合を返す。"""
+    return summarize_parse_modes(results, is_failure=lambda r: r["score"] == -1)
 
 
 async def score_pointwise(
@@ -37,30 +117,47 @@ async def score_pointwise(
     criterion: Criterion,
     *,
     semaphore: asyncio.Semaphore | None = None,
+    structured: bool = False,
+    model: str | None = None,
 ) -> PointwiseResult:
-    """1人の首相を指定基準で0〜100点のスコアで評価する。"""
+    """1人の首相を指定基準で0〜100点のスコアで評価する。
+
+    structured=True のときは JSON スキーマ {reasoning, score} の構造化出力で回答させる。
+    model を指定すると get_model() の代わりにそのモデルで呼び出す。
+    左右を入れ替えた基準（mirror_of あり）では API を呼ばず、元の基準のキャッシュの
+    スコアを 100 − s にした結果を返す（mirrored_pointwise_entry）。
+    """
+    if criterion.mirror_of is not None:
+        return PointwiseResult.from_dict(
+            mirrored_pointwise_entry(criterion, pm["no"], model=model)
+        )
     prompt = (
         f"以下の内閣総理大臣を「{criterion.left} ↔ {criterion.right}」の軸で0〜100点で評価してください。\n"
         f"{criterion.description}\n\n"
         f"{pm['name']}\n\n"
-        f"この人物についてこの軸に関する考察を簡潔に述べた上で、\n"
-        f"最後の行に「スコア: X」と、{criterion.left}寄りなら0点、{criterion.right}寄りなら100点として数字で回答してください。"
     )
+    if structured:
+        prompt += (
+            f"この人物についてこの軸に関する考察を reasoning に簡潔に述べた上で、\n"
+            f"score に、{criterion.left}寄りなら0点、{criterion.right}寄りなら100点として0〜100の整数で回答してください。"
+        )
+    else:
+        prompt += (
+            f"この人物についてこの軸に関する考察を簡潔に述べた上で、\n"
+            f"最後の行に「スコア: X」と、{criterion.left}寄りなら0点、{criterion.right}寄りなら100点として数字で回答してください。"
+        )
 
+    kwargs = {"text": _POINTWISE_SCHEMA} if structured else {}
     async with maybe_acquire(semaphore):
         r, elapsed, effort = await call_with_retry(
-            client, model=get_model(), input=prompt
+            client, model=model or get_model(), input=prompt, **kwargs
         )
 
     raw = (r.output_text or "").strip()
-    match = re.search(r"スコア[：:]\s*(\d+)", raw)
-    if match:
-        score = int(match.group(1))
+    if structured:
+        score, parse_mode = _decode_score(raw)
     else:
-        try:
-            score = int(raw.splitlines()[-1].strip())
-        except (ValueError, IndexError):
-            score = -1
+        score, parse_mode = _parse_score(raw), PARSE_MODE_TEXT
     return PointwiseResult(
         no=pm["no"],
         score=score,
@@ -72,4 +169,288 @@ async def score_pointwise(
         created_at=str(r.created_at),
         reasoning_effort=effort,
         reasoning_summary=extract_reasoning_summary(r),
+        parse_mode=parse_mode,
     )
+
+
+# 0〜100点の中央。ここに近いスコアは、どちらの極とも言い切れていない回答とみなす。
+_MIDPOINT = 50
+
+
+def pointwise_needs_escalation(
+    result: PointwiseResult, *, midpoint_band: float = 10.0
+) -> bool:
+    """評価結果から、より強いモデルで評価し直すべきかを判定する。
+
+    - スコアのパースに失敗した（0〜100 の外）
+    - スコアが中央（50点）から midpoint_band 点以内（どちらの極とも言い切れていない）
+
+    ペアワイズの迷いを示す表現（uncertainty_score）は、CoT の末尾でスコアを
+    言い切る形式には当てはまらないため使わない。
+    """
+    if not 0 <= result.score <= 100:
+        return True
+    return abs(result.score - _MIDPOINT) <= midpoint_band
+
+
+# ---------------------------------------------------------------------------
+# 複数人物をまとめて評価するバッチモード
+# ---------------------------------------------------------------------------
+
+# 「番号: スコア」の行（「1: 40」「【1】: 40」「1．スコア: 40」などの表記揺れを許容）
+_BATCH_LINE_PATTERN = re.compile(
+    r"^\s*[【\[(（]?(\d+)[】\])）]?\s*[.．、]?\s*(?:スコア)?\s*[：:]\s*(\d+)\s*(?:点)?\s*$",
+    re.MULTILINE,
+)
+
+
+def _parse_batch_scores(text: str, k: int) -> dict[int, int]:
+    """バッチ回答から {1始まりの番号: スコア} を抽出する。
+
+    考察中に同じ形式の行が現れても最終回答を採るため、同じ番号は後の行を優先する。
+    範囲外の番号や 0〜100 の外のスコアは採用しない。
+    """
+    scores: dict[int, int] = {}
+    for match in _BATCH_LINE_PATTERN.finditer(text):
+        index, score = int(match.group(1)), int(match.group(2))
+        if 1 <= index <= k and 0 <= score <= 100:
+            scores[index] = score
+    return scores
+
+
+async def _score_pointwise_chunk(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    semaphore: asyncio.Semaphore | None,
+) -> list[PointwiseResult]:
+    """k 人を1回の呼び出しで評価する。パースできなかった人物のスコアは -1。"""
+    reject_mirror_query(criterion)
+    k = len(pms)
+    listing = "\n".join(f"{i}. {pm['name']}" for i, pm in enumerate(pms, start=1))
+    prompt = (
+        f"以下の{k}人の内閣総理大臣を「{criterion.left} ↔ {criterion.right}」の軸でそれぞれ0〜100点で評価してください。\n"
+        f"{criterion.description}\n\n"
+        f"{listing}\n\n"
+        f"それぞれの人物についてこの軸に関する考察を簡潔に述べた上で、\n"
+        f"最後に全員分を1人1行で「番号: スコア」（例: 「1: 50」）の形式で、"
+        f"{criterion.left}寄りなら0点、{criterion.right}寄りなら100点として数字で回答してください。"
+    )
+
+    async with maybe_acquire(semaphore):
+        r, elapsed, effort = await call_with_retry(
+            client, model=get_model(), input=prompt
+        )
+
+    raw = (r.output_text or "").strip()
+    scores = _parse_batch_scores(raw, k)
+    usages = split_usage(extract_usage(r), k)
+    reasoning_summary = extract_reasoning_summary(r)
+    return [
+        PointwiseResult(
+            no=pm["no"],
+            score=scores.get(i, -1),
+            raw_response=raw,
+            usage=usages[i - 1],
+            elapsed_seconds=elapsed / k,
+            response_id=r.id,
+            model=r.model,
+            created_at=str(r.created_at),
+            reasoning_effort=effort,
+            reasoning_summary=reasoning_summary,
+        )
+        for i, pm in enumerate(pms, start=1)
+    ]
+
+
+async def score_pointwise_batch(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    batch_size: int = 8,
+    semaphore: asyncio.Semaphore | None = None,
+    stats: dict | None = None,
+) -> list[PointwiseResult]:
+    """batch_size 人ずつ1回の呼び出しで評価し、API 呼び出し回数を約 1/batch_size にする。
+
+    回答から「番号: スコア」を読み取れなかった人物は score_pointwise で1人ずつ評価し直す。
+    使用量と所要時間はバッチ内の人数で等分して各結果に記録する
+    （同じ呼び出しの結果は response_id と raw_response を共有する）。
+    評価し直した人物には、バッチ呼び出しでの取り分を再評価の使用量と所要時間に
+    加算するため、結果の合計は実際に課金された使用量と一致する。
+    stats を渡すと {"batches", "requeried"} を記録する。
+
+    Returns:
+        pms と同じ順の PointwiseResult のリスト。
+    """
+    chunks = [pms[i : i + batch_size] for i in range(0, len(pms), batch_size)]
+    chunk_results = await asyncio.gather(
+        *(
+            _score_pointwise_chunk(client, chunk, criterion, semaphore=semaphore)
+            for chunk in chunks
+        )
+    )
+    results = [result for chunk in chunk_results for result in chunk]
+
+    missing = [i for i, result in enumerate(results) if result.score < 0]
+    retried = await asyncio.gather(
+        *(
+            score_pointwise(client, pms[i], criterion, semaphore=semaphore)
+            for i in missing
+        )
+    )
+    for i, result in zip(missing, retried):
+        result.usage = results[i].usage + result.usage
+        result.elapsed_seconds += results[i].elapsed_seconds
+        results[i] = result
+
+    if stats is not None:
+        stats["batches"] = len(chunks)
+        stats["requeried"] = len(missing)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 自己一貫性サンプリング（複数回評価して集約、信頼区間で打ち切り）
+# ---------------------------------------------------------------------------
+
+SAMPLE_AGGREGATES = ("mean", "median")
+
+
+@dataclass
+class SampledPointwiseResult:
+    """複数サンプルを集約したポイントワイズ評価の結果。"""
+
+    no: int
+    score: float  # 有効サンプルの平均または中央値、有効サンプルがなければ -1
+    ci_low: float
+    ci_high: float
+    samples: list[PointwiseResult] = field(default_factory=list)
+
+    @property
+    def valid_scores(self) -> list[int]:
+        return [s.score for s in self.samples if 0 <= s.score <= 100]
+
+
+def _sample_intervals(
+    samples: list[list[int]], aggregate: str, ci: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """各人物の (集約スコア, 下限, 上限)。有効サンプルが2件未満なら区間は [0, 100]。
+
+    区間は平均の t 分布信頼区間を集約スコアの周りに取ったもの。
+    """
+    n = len(samples)
+    center = np.full(n, -1.0)
+    low = np.zeros(n)
+    high = np.full(n, 100.0)
+    for i, scores in enumerate(samples):
+        if not scores:
+            continue
+        x = np.asarray(scores, dtype=np.float64)
+        center[i] = x.mean() if aggregate == "mean" else np.median(x)
+        if len(x) >= 2:
+            half = student_t.ppf((1 + ci) / 2, len(x) - 1) * x.std(ddof=1)
+            half /= np.sqrt(len(x))
+            low[i], high[i] = center[i] - half, center[i] + half
+    return center, low, high
+
+
+def _neighbour_overlap(
+    center: np.ndarray, low: np.ndarray, high: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """スコア順で隣り合う人物との信頼区間の重なり。
+
+    Returns:
+        (重なり幅の合計, 隣と重なっているか)。端点が接する場合（幅 0 の区間同士の
+        同点を含む）も重なっているとみなす。
+    """
+    order = np.argsort(center, kind="stable")
+    lo, hi = low[order], high[order]
+    gap = np.minimum(hi[:-1], hi[1:]) - np.maximum(lo[:-1], lo[1:])
+    width = np.maximum(0.0, gap)
+    touching = gap >= 0
+    per_width = np.zeros(len(center))
+    per_width[:-1] += width
+    per_width[1:] += width
+    per_touching = np.zeros(len(center), dtype=bool)
+    per_touching[:-1] |= touching
+    per_touching[1:] |= touching
+    overlap = np.empty_like(per_width)
+    overlaps = np.empty_like(per_touching)
+    overlap[order] = per_width
+    overlaps[order] = per_touching
+    return overlap, overlaps
+
+
+async def score_pointwise_sampled(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    initial_samples: int = 3,
+    max_samples: int = 10,
+    aggregate: str = "mean",
+    ci: float = 0.95,
+    round_size: int | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    stats: dict | None = None,
+) -> list[SampledPointwiseResult]:
+    """各人物を複数回評価して集約し、順位が不確かな人物にだけ追加サンプルを割り当てる。
+
+    最初に全員を initial_samples 回ずつ並列に評価する。その後のラウンドでは、
+    スコア順で隣り合う人物と信頼区間が重なっている人物のうち、
+    重なり幅の大きい順に round_size 人（省略時は全員）へ1サンプルずつ追加する。
+    両隣と信頼区間が分離した人物と max_samples に達した人物は打ち切る。
+    全サンプルが同じ値（区間の幅が 0）でも、隣と同点なら分離していないとみなす。
+    stats を渡すと {"calls", "rounds", "early_stopped"} を記録する。
+
+    Returns:
+        pms と同じ順の SampledPointwiseResult のリスト。
+    """
+    if aggregate not in SAMPLE_AGGREGATES:
+        raise ValueError(f"未対応の集約方法です: {aggregate!r}")
+
+    samples: list[list[PointwiseResult]] = [[] for _ in pms]
+
+    async def draw(indices: list[int]) -> None:
+        results = await asyncio.gather(
+            *(
+                score_pointwise(client, pms[i], criterion, semaphore=semaphore)
+                for i in indices
+            )
+        )
+        for i, result in zip(indices, results):
+            samples[i].append(result)
+
+    await draw([i for i in range(len(pms)) for _ in range(initial_samples)])
+    rounds = 1
+
+    while True:
+        valid = [[s.score for s in ss if 0 <= s.score <= 100] for ss in samples]
+        center, low, high = _sample_intervals(valid, aggregate, ci)
+        overlap, overlaps = _neighbour_overlap(center, low, high)
+        counts = np.array([len(ss) for ss in samples])
+        candidates = np.flatnonzero(overlaps & (counts < max_samples))
+        if len(candidates) == 0:
+            break
+        chosen = candidates[np.argsort(-overlap[candidates], kind="stable")]
+        await draw(chosen[:round_size].tolist())
+        rounds += 1
+
+    if stats is not None:
+        stats["calls"] = int(counts.sum())
+        stats["rounds"] = rounds
+        stats["early_stopped"] = int((counts < max_samples).sum())
+
+    return [
+        SampledPointwiseResult(
+            no=pm["no"],
+            score=float(center[i]),
+            ci_low=float(low[i]),
+            ci_high=float(high[i]),
+            samples=samples[i],
+        )
+        for i, pm in enumerate(pms)
+    ]
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+
+from openai import AsyncOpenAI
+
+from ..core.cache import load_results, nested_int_keys, save_results
+from ..core.criteria import Criterion
+from .pairwise.compare import compare_pair
+from .pointwise import score_pointwise
+
+logger = logging.getLogger(__name__)
+
+
+def find_invalid_pairwise(pair_results: dict) -> list[tuple[int, int]]:
+    """winner が "A" / "B" 以外の比較 (no_a, no_b) を列挙する（推定エントリは除く）。"""
+    return [
+        (a, b)
+        for a, inner in sorted(pair_results.items())
+        for b, entry in sorted(inner.items())
+        if not entry.get("inferred") and entry["winner"] not in ("A", "B")
+    ]
+
+
+def find_invalid_pointwise(results: list[dict]) -> list[int]:
+    """スコアのパースに失敗した（score が 0〜100 の外の）結果のインデックスを列挙する。"""
+    return [i for i, r in enumerate(results) if not 0 <= r["score"] <= 100]
+
+
+async def requery_invalid_pairwise(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    pair_results: dict,
+    *,
+    max_attempts: int = 2,
+    structured: bool = False,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict:
+    """INVALID の比較だけを同じ提示順で問い合わせ直し、pair_results をその場で書き換える。
+
+    1件あたり最大 max_attempts 回まで問い合わせる。既定では元の比較と同じプロンプト・
+    出力形式で問い合わせ、structured=True のときは構造化出力（compare_pair の
+    structured モード）で回答形式を強制する。書き換えたエントリには "requeried": True を付け、
+    どちらの形式で得た回答かは "parse_mode" で区別できる。
+
+    Returns:
+        {"invalid", "fixed", "remaining", "calls"}
+    """
+    pms_by_no = {p["no"]: p for p in pms}
+    pending = find_invalid_pairwise(pair_results)
+    stats = {"invalid": len(pending), "fixed": 0, "remaining": 0, "calls": 0}
+
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        results = await asyncio.gather(
+            *[
+                compare_pair(
+                    client,
+                    pms_by_no[a],
+                    pms_by_no[b],
+                    criterion,
+                    semaphore=semaphore,
+                    structured=structured,
+                )
+                for a, b in pending
+            ]
+        )
+        stats["calls"] += len(results)
+        pending = []
+        for result in results:
+            if result.winner in ("A", "B"):
+                pair_results[result.no_a][result.no_b] = {
+                    **result.to_dict(),
+                    "requeried": True,
+                }
+                stats["fixed"] += 1
+            else:
+                pending.append((result.no_a, result.no_b))
+
+    stats["remaining"] = len(pending)
+    return stats
+
+
+async def requery_invalid_pointwise(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    results: list[dict],
+    *,
+    max_attempts: int = 2,
+    structured: bool = False,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict:
+    """スコアのパースに失敗した人物だけを評価し直し、results をその場で書き換える。
+
+    structured と書き換えたエントリの印（"requeried"・"parse_mode"）は
+    requery_invalid_pairwise と同じ。
+
+    Returns:
+        {"invalid", "fixed", "remaining", "calls"}
+    """
+    pms_by_no = {p["no"]: p for p in pms}
+    pending = find_invalid_pointwise(results)
+    stats = {"invalid": len(pending), "fixed": 0, "remaining": 0, "calls": 0}
+
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        fresh = await asyncio.gather(
+            *[
+                score_pointwise(
+                    client,
+                    pms_by_no[results[i]["no"]],
+                    criterion,
+                    semaphore=semaphore,
+                    structured=structured,
+                )
+                for i in pending
+            ]
+        )
+        stats["calls"] += len(fresh)
+        still_invalid = []
+        for i, result in zip(pending, fresh):
+            if 0 <= result.score <= 100:
+                results[i] = {**result.to_dict(), "requeried": True}
+                stats["fixed"] += 1
+            else:
+                still_invalid.append(i)
+        pending = still_invalid
+
+    stats["remaining"] = len(pending)
+    return stats
+
+
+async def requery_cached(
+    client: AsyncOpenAI,
+    pms: list[dict],
+    criterion: Criterion,
+    *,
+    experiments: tuple[str, ...] = ("pairwise", "pointwise"),
+    max_attempts: int = 2,
+    structured: bool = False,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict[str, dict]:
+    """キャッシュ済みの結果の INVALID・パース失敗だけを問い合わせ直し、キャッシュに書き戻す。
+
+    修正できた結果があった実験のみ保存する。キャッシュがない実験は結果に含めない。
+
+    Returns:
+        {experiment: requery_invalid_* の stats}
+    """
+    summary: dict[str, dict] = {}
+    for experiment in experiments:
+        cached = load_results(experiment, criterion.name)
+        if cached is None:
+            continue
+        if experiment == "pairwise":
+            cached = nested_int_keys(cached)
+            stats = await requery_invalid_pairwise(
+                client,
+                pms,
+                criterion,
+                cached,
+                max_attempts=max_attempts,
+                structured=structured,
+                semaphore=semaphore,
+            )
+        elif experiment == "pointwise":
+            stats = await requery_invalid_pointwise(
+                client,
+                pms,
+                criterion,
+                cached,
+                max_attempts=max_attempts,
+                structured=structured,
+                semaphore=semaphore,
+            )
+        else:
+            raise ValueError(f"未対応の実験です: {experiment!r}")
+        if stats["fixed"]:
+            save_results(experiment, criterion.name, cached)
+        if stats["remaining"]:
+            logger.warning(
+                "%s/%s: %d件は再問い合わせ後も無効のままです",
+                experiment,
+                criterion.name,
+                stats["remaining"],
+            )
+        summary[experiment] = stats
+    return summary
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from pm_sort.core.criteria import CRITERIA
+from pm_sort.methods.pairwise.compare import compare_pairs_adaptive
+
+
+class _FakeResponses:
+    """番号の大きい人物を常に右寄りと答える（迷いを示す表現なし）。"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        no_a, no_b = (int(n) for n in re.findall(r"【[AB]】PM(\d+)", kwargs["input"]))
+        winner = "A" if no_a > no_b else "B"
+        usage = SimpleNamespace(
+            input_tokens=100,
+            output_tokens=50,
+            total_tokens=150,
+            input_tokens_details=SimpleNamespace(cached_tokens=0),
+            output_tokens_details=SimpleNamespace(reasoning_tokens=0),
+        )
+        return SimpleNamespace(
+            output_text=f"考察\n回答: {winner}",
+            usage=usage,
+            id="resp",
+            model="fake",
+            created_at=0,
+            output=[],
+        )
+
+
+@pytest.fixture(autouse=True)
+def _model(monkeypatch):
+    monkeypatch.setenv("LLM_SORT_MODEL", "fake")
+
+
+def _run(pair_results=None, **kwargs):
+    client = SimpleNamespace(responses=_FakeResponses())
+    pms = [{"no": no, "name": f"PM{no}"} for no in range(1, 9)]
+    result = asyncio.run(
+        compare_pairs_adaptive(
+            client,
+            pms,
+            CRITERIA["left_right"],
+            pair_results=pair_results,
+            rng=random.Random(0),
+            **kwargs,
+        )
+    )
+    return client.responses.calls, *result
+
+
+def test_skips_reverse_calls_with_default_bias():
+    calls, pair_results, stats = _run()
+    assert stats["skipped"] == stats["pairs"] == 28
+    assert stats["reverse_calls"] == 0
+    assert len(calls) == 28
+    inferred = [e for inner in pair_results.values() for e in inner.values()]
+    assert sum(bool(e.get("inferred")) for e in inferred) == 28
+
+
+def test_no_skip_when_default_bias_exceeds_threshold():
+    calls, _, stats = _run(default_bias=0.5, batch_size=100)
+    assert stats["skipped"] == 0
+    assert len(calls) == 56
+
+
+def test_queries_only_missing_direction():
+    _, cached, _ = _run(default_bias=0.5)
+    # 2→1 の方向だけを残し、1→2 を欠けさせる
+    kept = cached[2][1]
+    del cached[1][2]
+    calls, pair_results, stats = _run(pair_results=cached)
+    assert stats["pairs"] == 1
+    assert len(calls) == 1
+    assert re.findall(r"【[AB]】PM(\d+)", calls[0]["input"]) == ["1", "2"]
+    assert pair_results[2][1] is kept
+
+
+def test_rerun_on_own_output_makes_no_calls():
+    _, cached, _ = _run()
+    calls, pair_results, stats = _run(pair_results=cached)
+    assert stats["pairs"] == 0
+    assert calls == []
+    assert pair_results is cached
+
+
+def test_requery_inferred_queries_only_inferred_directions():
+    _, cached, _ = _run()
+    calls, pair_results, stats = _run(pair_results=cached, requery_inferred=True)
+    assert stats["pairs"] == 28
+    assert len(calls) == 28
+    assert not any(
+        e.get("inferred") for inner in pair_results.values() for e in inner.values()
+    )
@@ -0,0 +1,32 @@
+from pm_sort.core.criteria import CRITERIA
+from pm_sort.methods.pairwise.multi import _parse_multi_winners
+
+_CRITERIA = [CRITERIA["left_right"], CRITERIA["dog_cat"]]
+
+
+def test_plain_lines():
+    text = "考察\nleft_right: A\ndog_cat: b"
+    assert _parse_multi_winners(text, _CRITERIA) == {"left_right": "A", "dog_cat": "B"}
+
+
+def test_bullets_emphasis_and_trailing_notes():
+    text = (
+        "考察\n"
+        "- left_right: A\n"
+        "* **dog_cat**: B\n"
+        "・left_right: **B**（右派寄り）\n"
+        "1. dog_cat：A （どちらかといえば犬派）\n"
+    )
+    assert _parse_multi_winners(text, _CRITERIA) == {"left_right": "B", "dog_cat": "A"}
+
+
+def test_rejects_axis_listing_and_other_words():
+    text = (
+        "- left_right: 「左派 ↔ 右派」\n"
+        "dog_cat: Alice の方が犬派\n"
+        "left_right_extra: A\n"
+    )
+    assert _parse_multi_winners(text, _CRITERIA) == {
+        "left_right": "INVALID",
+        "dog_cat": "INVALID",
+    }
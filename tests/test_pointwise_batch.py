@@ -0,0 +1,65 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from pm_sort.core.criteria import CRITERIA
+from pm_sort.methods.pointwise import score_pointwise_batch
+
+
+def _usage(input_tokens, output_tokens):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+        input_tokens_details=SimpleNamespace(cached_tokens=0),
+        output_tokens_details=SimpleNamespace(reasoning_tokens=0),
+    )
+
+
+class _FakeResponses:
+    """バッチ呼び出しでは2番目の人物の行だけ欠けた回答を返す。"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if match := re.search(r"以下の(\d+)人", kwargs["input"]):
+            k = int(match.group(1))
+            lines = [f"{i}: {10 * i}" for i in range(1, k + 1) if i != 2]
+            text, usage = "考察\n" + "\n".join(lines), _usage(300, 90)
+        else:
+            text, usage = "考察\nスコア: 40", _usage(100, 30)
+        return SimpleNamespace(
+            output_text=text,
+            usage=usage,
+            id="resp",
+            model="fake",
+            created_at=0,
+            output=[],
+        )
+
+
+@pytest.fixture(autouse=True)
+def _model(monkeypatch):
+    monkeypatch.setenv("LLM_SORT_MODEL", "fake")
+
+
+def test_requeried_item_keeps_its_batch_usage():
+    client = SimpleNamespace(responses=_FakeResponses())
+    pms = [{"no": no, "name": f"PM{no}"} for no in range(1, 4)]
+    stats = {}
+    results = asyncio.run(
+        score_pointwise_batch(
+            client, pms, CRITERIA["left_right"], batch_size=3, stats=stats
+        )
+    )
+    assert stats == {"batches": 1, "requeried": 1}
+    assert len(client.responses.calls) == 2
+    assert [r.score for r in results] == [10, 40, 30]
+    assert sum(r.usage.input_tokens for r in results) == 300 + 100
+    assert sum(r.usage.output_tokens for r in results) == 90 + 30
+    assert sum(r.usage.total_tokens for r in results) == 390 + 130
+    assert results[1].usage.input_tokens == 100 + 100